@@ -79,6 +79,14 @@ Theme files may contain the following variables which are known by axify:
 * yLabel
 * imagePath – path to the rendered png
 * colormap – defining text of the colormap
+* statMin – minimum of the data, ignoring NaN entries
+* statMax – maximum of the data, ignoring NaN entries
+* statNaN – number of NaN entries in the data
+* tiles – an \addplot graphics for every tile of the image, see the tiles
+  argument of toHeatmap
+* magMin, magMax, phaseMin, phaseMax – range of the magnitude and the
+  phase of complex heatmaps, see toComplexHeatmap
+* legendPath – path to the legend of the colors of a complex heatmap
 * any self defined variables, which have to be filled by adding
 themeArgs to the call for the scatter or heatmap plots
 
@@ -137,4 +145,17 @@ from .axify import Theme
 from .axify import ColorMap
 from .axify import toHeatmap
 from .axify import toScatter
+from .axify import toHeatmapStack
+from .axify import toDensity
+from .axify import toLines
+from .axify import toComplexHeatmap
 from .axify import generateHeader
+from .axify import RenderCache
+from .axify import renderBatch
+from .axify import Stats
+from .axify import computeStats
+from .axify import watch
+from .axify import Profile
+from .axify import RenderResult
+from .axify import renderHeatmap
+from .axify import renderScatter
@@ -16,14 +16,323 @@
 # along with axify.  If not, see <http://www.gnu.org/licenses/>.
 
 
-import colorfy
-import argparse
-import numpy as np
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap
-import matplotlib.colors as clr
-import matplotlib.cm as cmx
+import contextlib
+import csv
+import hashlib
+import importlib
+import io
+import json
 import os
+import re
+import shutil
+import struct
+import sys
+import threading
+import time
+import tracemalloc
+import zlib
+
+# file locks serialising the render cache between processes
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+    import msvcrt
+
+
+class _LazyModule:
+    r"""
+    Placeholder of a module, which is imported once one of its attributes
+    is used and then takes the place of the placeholder in this module.
+    Like import a.b, an alias equal to the package a stands for a.
+    """
+
+    def __init__(self, alias, name):
+        self._alias = alias
+        self._name = name
+
+    def __getattr__(self, attr):
+        module = importlib.import_module(self._name)
+        if self._alias == self._name.split('.')[0]:
+            module = sys.modules[self._alias]
+
+        globals()[self._alias] = module
+        return getattr(module, attr)
+
+
+# numpy and the thread pools are only imported once something is rendered,
+# which keeps importing axify and the start of the command line tool fast
+np = _LazyModule('np', 'numpy')
+concurrent = _LazyModule('concurrent', 'concurrent.futures')
+
+
+# default upper bound of working memory used while rendering, in bytes
+_MEM_BUDGET = 256 * 2**20
+
+# working memory needed per pixel while rendering a band of an image, i.e.
+# the float copy, the lookup indices, the colors and the scanline buffer
+_BYTES_PER_PIXEL = 8 + 2 + 4 + 5
+
+
+# values every plotting routine fills into a theme
+_PLOT_INFO_KEYS = {
+    'dataMin', 'dataMax', 'xMin', 'xMax', 'xLabel', 'yMin', 'yMax',
+    'yLabel', 'savePath', 'imagePath', 'colormap',
+    'statMin', 'statMax', 'statNaN', 'tiles'
+}
+
+# values filled into a theme arranging all frames of a stack in a group
+_GROUP_INFO_KEYS = _PLOT_INFO_KEYS.union({'frames', 'groupSize'})
+
+# values filled into a theme of a complex heatmap
+_COMPLEX_INFO_KEYS = _PLOT_INFO_KEYS.union({
+    'magMin', 'magMax', 'phaseMin', 'phaseMax', 'legendPath'
+})
+
+# placeholders of %-formatting as understood by python, i.e. an optional
+# mapping key, flags, width, precision, length modifier and conversion
+_PLACEHOLDER = re.compile(
+    r'%(?:\((?P<key>[^)]*)\))?(?P<spec>[#0 +-]*(?:\*|\d+)?'
+    r'(?:\.(?:\*|\d+))?[hlL]?[diouxXeEfFgGcrsa%])'
+)
+
+# profiles currently recording the stages of the render pipeline
+_profiles = []
+
+
+class Profile:
+    r"""
+    Render Pipeline Profile
+
+    While used as a context manager, this class records the time spent in
+    the stages of the render pipeline for every file, i.e. mapping the data
+    ('load'), looking up the render cache ('cache'), computing statistics
+    and limits ('stats'), preparing the colormap ('colormap'), mapping the
+    data to colors ('quantize'), rasterizing scatter plots ('rasterize'),
+    encoding the image ('encode') and writing the TeX file ('compose'),
+    together with the number of bytes every stage read or wrote.
+
+    If callback is given, it is called with the file, the stage, the time
+    in seconds and the number of bytes whenever a stage finishes. Files
+    rendered in worker processes of renderBatch are reported once they are
+    done. With traceMemory, the peak memory allocated within every stage is
+    recorded as well via tracemalloc, which slows the rendering down.
+
+    As long as no profile is active, the stages are not timed at all.
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> with ax.Profile() as prof:
+    ...     ax.toHeatmap(data, 'data', thme, cmap)
+    >>> print(prof.summary())
+    >>> prof.save('profile.csv')
+    """
+
+    _columns = ['file', 'stage', 'calls', 'time', 'bytes', 'peak']
+
+    @property
+    def records(self):
+        return [
+            dict(zip(self._columns, key + tuple(values)))
+            for key, values in self._stages.items()
+        ]
+
+    @property
+    def traceMemory(self):
+        return self._traceMemory
+
+    def __init__(self, callback=None, traceMemory=False):
+        self._callback = callback
+        self._traceMemory = traceMemory
+        self._stopTracing = False
+        self._lock = threading.Lock()
+
+        # calls, time, bytes and peak memory keyed by file and stage
+        self._stages = {}
+
+    def __enter__(self):
+        if self._traceMemory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._stopTracing = True
+
+        _profiles.append(self)
+        return self
+
+    def __exit__(self, *args):
+        _profiles.remove(self)
+
+        if self._stopTracing:
+            tracemalloc.stop()
+            self._stopTracing = False
+
+    def _add(self, path, stage, calls, elapsed, numBytes, peak):
+        # stages may finish in several threads at once
+        with self._lock:
+            values = self._stages.setdefault((path, stage), [0, 0.0, 0, 0])
+            values[0] += calls
+            values[1] += elapsed
+            values[2] += numBytes
+            values[3] = max(values[3], peak)
+
+        if self._callback is not None:
+            self._callback(path, stage, elapsed, numBytes)
+
+    def _merge(self, dctStages):
+        for (path, stage), values in dctStages.items():
+            self._add(path, stage, *values)
+
+    def summary(self):
+        r"""
+        Return a table of the time and bytes of every stage summed over all
+        files, slowest stage first.
+        """
+        dctTotal = {}
+        for (path, stage), values in self._stages.items():
+            total = dctTotal.setdefault(stage, [0, 0.0, 0, 0])
+            total[0] += values[0]
+            total[1] += values[1]
+            total[2] += values[2]
+            total[3] = max(total[3], values[3])
+
+        allTime = sum(total[1] for total in dctTotal.values())
+
+        lstLines = ['%-10s %8s %10s %7s %12s %11s' % (
+            'stage', 'calls', 'time [s]', 'share', 'bytes [MiB]', 'peak [MiB]'
+        )]
+        for stage, total in sorted(
+            dctTotal.items(), key=lambda item: -item[1][1]
+        ):
+            lstLines.append('%-10s %8d %10.3f %6.1f%% %12.1f %11.1f' % (
+                stage, total[0], total[1],
+                100 * total[1] / allTime if allTime > 0 else 0,
+                total[2] / 2**20, total[3] / 2**20
+            ))
+
+        lstLines.append('%-10s %8s %10.3f' % ('total', '', allTime))
+
+        return '\n'.join(lstLines)
+
+    def save(self, path):
+        r"""
+        Write the records of every file and stage to path, as CSV if path
+        ends with .csv and as JSON otherwise.
+        """
+        if path.endswith('.csv'):
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, self._columns)
+                writer.writeheader()
+                writer.writerows(self.records)
+        else:
+            with open(path, 'w') as f:
+                json.dump(self.records, f, indent=1)
+
+
+class _Stage:
+    r"""
+    Times a stage of the render pipeline for all active profiles. The
+    number of bytes the stage processed can be set via the bytes attribute.
+    """
+
+    def __init__(self, stage, path):
+        self.stage = stage
+        self.path = path
+        self.bytes = 0
+
+    def __enter__(self):
+        self._traced = tracemalloc.is_tracing() and any(
+            profile.traceMemory for profile in _profiles
+        )
+        if self._traced:
+            tracemalloc.reset_peak()
+            self._memory = tracemalloc.get_traced_memory()[0]
+
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *args):
+        elapsed = time.perf_counter() - self._start
+
+        if self._traced:
+            peak = tracemalloc.get_traced_memory()[1] - self._memory
+        else:
+            peak = 0
+
+        for profile in list(_profiles):
+            profile._add(self.path, self.stage, 1, elapsed, self.bytes, peak)
+
+
+class _NoStage:
+    # stands in for a stage while nothing is profiled
+    bytes = 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        pass
+
+
+_noStage = _NoStage()
+
+
+def _stage(stage, path):
+    return _Stage(stage, path) if _profiles else _noStage
+
+
+def _profiled(traceMemory, function, *args):
+    # record the stages in a worker process, such that they can be passed
+    # on to the profiles of the calling process
+    with Profile(traceMemory=traceMemory) as profile:
+        res = function(*args)
+
+    return res, profile._stages
+
+
+# the graphics of a theme, which is repeated for every tile of an image
+# split into tiles, unless the theme places them via the tiles variable
+_GRAPHICS = re.compile(
+    r'[ \t]*\\addplot\s+graphics\s*(?:\[[^\]]*\]\s*)?'
+    r'\{%\(imagePath\)s\}\s*;[ \t]*\n?'
+)
+
+# compiled themes loaded so far in this process, keyed by path
+_themeCache = {}
+
+
+def _compileTheme(string):
+    r"""
+    Split a theme into literal text and (key, format) pairs of its
+    placeholders, such that it can be filled without parsing it again.
+    """
+    lstParts = []
+    pos = 0
+    for match in _PLACEHOLDER.finditer(string):
+        # every percent sign must start a valid placeholder
+        if '%' in string[pos:match.start()]:
+            break
+
+        lstParts.append(string[pos:match.start()])
+        pos = match.end()
+
+        if match.group('spec') == '%':
+            lstParts.append('%')
+        elif match.group('key') is None or '*' in match.group('spec'):
+            raise ValueError(
+                'Theme placeholder %s needs a name' % match.group(0)
+            )
+        else:
+            lstParts.append((match.group('key'), '%' + match.group('spec')))
+
+    if '%' in string[pos:]:
+        idx = string.index('%', pos)
+        raise ValueError(
+            'Invalid theme placeholder %s' % string[idx:idx + 10]
+        )
+
+    lstParts.append(string[pos:])
+
+    return [part for part in lstParts if part != '']
 
 
 class Theme:
@@ -36,6 +345,14 @@ class Theme:
 
     Most of the plotting routines need a theme to work with.
 
+    Themes are compiled once when loaded and kept for the whole process,
+    such that constructing the same theme again is cheap. They are only
+    read again once the file changes.
+
+    Images split into tiles are shown by repeating the \addplot graphics
+    of imagePath for every tile, or by the tiles variable, which holds an
+    \addplot graphics for every tile.
+
     Examples
     --------
     >>> import axify as ax
@@ -49,19 +366,96 @@ class Theme:
     def path(self):
         return self._path
 
+    @property
+    def keys(self):
+        r"""
+        Names of all values the theme needs to be filled.
+        """
+        return self._keys
+
+    @property
+    def tileable(self):
+        r"""
+        Whether the theme can show images split into tiles.
+        """
+        return 'tiles' in self._keys or self._tileParts is not None
+
     def __init__(self, path):
         self._path = path
-        try:
-            open(self._path)
-        except (FileNotFoundError):
-            print('Could not find theme file ' + path)
-        else:
-            with open(self._path) as f:
-                self._string = f.read()
+        self.reload()
 
     def reload(self):
-        with open(self._path) as f:
-            self._string = f.read()
+        r"""
+        Load the theme again, if its file changed since it was loaded.
+        """
+        mtime = os.stat(self._path).st_mtime_ns
+        if _themeCache.get(self._path, (None,))[0] != mtime:
+            with open(self._path) as f:
+                string = f.read()
+
+            lstParts = _compileTheme(string)
+
+            # the parts before, of and after the graphics to repeat for tiles
+            match = _GRAPHICS.search(string)
+            if match is not None:
+                tileParts = (
+                    _compileTheme(string[:match.start()]),
+                    _compileTheme(match.group(0)),
+                    _compileTheme(string[match.end():])
+                )
+            else:
+                tileParts = None
+
+            _themeCache[self._path] = (
+                mtime, string, lstParts,
+                frozenset(part[0] for part in lstParts if type(part) is tuple),
+                tileParts
+            )
+
+        (_, self._string, self._parts,
+         self._keys, self._tileParts) = _themeCache[self._path]
+
+    def check(self, keys):
+        r"""
+        Make sure that the given keys suffice to fill the theme and raise a
+        KeyError naming the missing ones otherwise.
+        """
+        missing = self._keys.difference(keys)
+        if missing:
+            raise KeyError(
+                'Theme %s needs the themeArgs %s' %
+                (self._path, ', '.join(sorted(missing)))
+            )
+
+    @staticmethod
+    def _fill(lstParts, dctPlotInfo):
+        return ''.join([
+            part if type(part) is str else part[1] % (dctPlotInfo[part[0]],)
+            for part in lstParts
+        ])
+
+    def render(self, dctPlotInfo):
+        r"""
+        Fill the theme with the given values. If they describe an image
+        split into tiles via tileInfo, the graphics of the theme are repeated
+        for every tile, unless the theme uses the tiles variable.
+        """
+        lstTiles = dctPlotInfo.get('tileInfo')
+        if lstTiles is None or 'tiles' in self._keys:
+            return self._fill(self._parts, dctPlotInfo)
+
+        prefix, graphics, suffix = self._tileParts
+        return ''.join(
+            [self._fill(prefix, dctPlotInfo)] +
+            [self._fill(graphics, dict(dctPlotInfo, **dctTile))
+             for dctTile in lstTiles] +
+            [self._fill(suffix, dctPlotInfo)]
+        )
+
+
+# colormaps and colorfy workspaces loaded so far in this process
+_colorMapCache = {}
+_workspaceCache = {}
 
 
 class ColorMap:
@@ -71,6 +465,11 @@ class ColorMap:
     This class provides various methods to load, import and print colorbars
     which then are used in the plots created by axify.
 
+    Colormaps are loaded only once per process, so constructing the same
+    colormap again is cheap. Colorfy workspaces are reloaded once their
+    file changes. The keyword argument N resamples the colormap to N colors,
+    e.g. N=4096 for a finer lookup table when rendering.
+
     Examples
     --------
     >>> import axify as ax
@@ -81,369 +480,4052 @@ class ColorMap:
     def obj(self):
         return self._obj
 
+    @property
+    def name(self):
+        return self._name
+
+    @property
+    def lut(self):
+        r"""
+        RGBA lookup table of the colormap as an (N + 3) x 4 array of uint8.
+
+        The first N entries are the regular colors of the matplotlib
+        colormap, followed by the under, over and bad colors, just like
+        matplotlib orders them internally.
+        """
+        if 'lut' not in self._cache:
+            N = self._obj.N
+            lut = np.empty((N + 3, 4), dtype=np.uint8)
+            lut[:N] = self._obj(np.arange(N), bytes=True)
+            for ii, col in enumerate([
+                self._obj.get_under(),
+                self._obj.get_over(),
+                self._obj.get_bad()
+            ]):
+                lut[N + ii] = (255 * np.asarray(col)).astype(np.uint8)
+
+            # the table is shared by all instances of this colormap
+            lut.setflags(write=False)
+            self._cache['lut'] = lut
+
+        return self._cache['lut']
+
     def __init__(self, name, **kwargs):
-        # remember if we found a map in the colorfy workspace
-        nameFound = 0
+        wsPath = kwargs.get('colorfy')
+        N = kwargs.get('N')
+
+        # colormaps are only loaded once per process, as long as their
+        # colorfy workspace does not change
+        if wsPath is not None:
+            mtime = os.stat(wsPath + '.json').st_mtime_ns
+        else:
+            mtime = None
 
-        # check if we should import a colorfy workspace
-        if 'colorfy' in kwargs:
+        key = (name, N, wsPath, mtime)
+        if key not in _colorMapCache:
+            _colorMapCache[key] = self._load(name, wsPath, mtime, N)
 
-            # try to load it
-            ws = colorfy.Workspace(kwargs['colorfy'])
+        self._name, self._obj, self._cols, self._pos, self._cache = \
+            _colorMapCache[key]
 
-            # now look if we can find the colorbar in the workspace
-            for ccbb in ws.colorMaps:
-                if ccbb._name == name:
-                    nameFound = 1
+    @staticmethod
+    def _load(name, wsPath, mtime, N):
+        # look for the colorbar in the colorfy workspace first
+        if wsPath is not None:
+            if _workspaceCache.get(wsPath, (None, None))[0] != mtime:
+                import colorfy
+                _workspaceCache[wsPath] = (mtime, colorfy.Workspace(wsPath))
 
+            for ccbb in _workspaceCache[wsPath][1].colorMaps:
+                if ccbb._name == name:
                     # extract the colorbar information from the workspace
-                    self._name = ccbb.name
-                    self._cols = [col.tplDef for col in ccbb.colors]
-                    self._pos = [pos for pos in ccbb.positions]
+                    cols = [col.tplDef for col in ccbb.colors]
+                    pos = [pos for pos in ccbb.positions]
 
-                    # prepare the data to be registered as a matplotlib
-                    # colormap
+                    # prepare the data for a matplotlib colormap
                     cdct = {}
                     cdct['red'] = []
                     cdct['green'] = []
                     cdct['blue'] = []
-                    for cc, pp in zip(self._cols, self._pos):
+                    for cc, pp in zip(cols, pos):
                         cdct['red'].append([pp, cc[0], cc[0]])
                         cdct['green'].append([pp, cc[1], cc[1]])
                         cdct['blue'].append([pp, cc[2], cc[2]])
 
-                    plt.register_cmap(name=self._name, data=cdct)
-                    self._obj = plt.get_cmap(self._name)
+                    from matplotlib.colors import LinearSegmentedColormap
+                    obj = LinearSegmentedColormap(
+                        ccbb.name, cdct, 256 if N is None else N
+                    )
 
-                    # create a sampling of the resulting colormap
-                    self._smpl = self._sample()
+                    return ccbb.name, obj, cols, pos, {}
 
         # if we did not find it in the workspace, it must be a
-        # matplotlib colorbar
-        if nameFound == 0:
-            if name in plt.colormaps():
-                self._name = name
-                self._obj = plt.get_cmap(self._name)
-                self._cols = []
-                self._pos = []
-                self._smpl = self._sample()
-            else:
-                raise(NotImplementedError)
+        # matplotlib colorbar, which does not need pyplot
+        import matplotlib
+        if name in matplotlib.colormaps:
+            obj = matplotlib.colormaps[name]
+            if N is not None:
+                obj = obj.resampled(N)
+
+            return name, obj, [], [], {}
+        else:
+            raise(NotImplementedError)
+
+    def sample(self, num=256):
+        r"""
+        Sample the colormap at num equidistant positions from 0 to 1 and
+        return the colors as num x 3 array of RGB values.
+        """
+        key = ('sample', num)
+        if key not in self._cache:
+            smpl = self._obj(np.linspace(0, 1, num))[:, :3]
+            smpl.setflags(write=False)
+            self._cache[key] = smpl
+
+        return self._cache[key]
 
-    def _sample(self):
-        num = 100
-        colMapNorm = clr.Normalize(vmin=0, vmax=1)
-        scalarMap = cmx.ScalarMappable(norm=colMapNorm, cmap=self._obj)
+    def _knots(self, tol):
+        # colorfy colormaps are defined by their knots already
+        if len(self._pos) > 0:
+            return np.array(self._pos), np.array(self._cols)[:, :3]
 
-        res = np.empty((3, num))
+        # otherwise find the fewest entries of the colormap, which linearly
+        # interpolated deviate at most by tol from all entries
+        N = self._obj.N
+        pos = np.linspace(0, 1, N)
+        cols = self._obj(np.arange(N))[:, :3]
 
-        for ii in range(num):
-            res[:, ii] = scalarMap.to_rgba(float(ii) / (num - 1))[:3]
+        keep = np.zeros(N, dtype=bool)
+        keep[[0, -1]] = True
+        lstSegments = [(0, N - 1)]
+        while lstSegments:
+            ii, jj = lstSegments.pop()
+            if jj - ii < 2:
+                continue
 
-        return res
+            t = (pos[ii + 1:jj, None] - pos[ii]) / (pos[jj] - pos[ii])
+            err = np.abs(
+                cols[ii] + t * (cols[jj] - cols[ii]) - cols[ii + 1:jj]
+            ).max(axis=1)
 
-    def toPGF(self):
+            kk = np.argmax(err)
+            if err[kk] > tol:
+                keep[ii + 1 + kk] = True
+                lstSegments += [(ii, ii + 1 + kk), (ii + 1 + kk, jj)]
+
+        return pos[keep], cols[keep]
+
+    def toPGF(self, tol=0.5 / 255):
+        r"""
+        Return the colormap as pgfplots colormap definition. The colormap
+        is approximated by as few knots as possible, such that no color
+        deviates by more than tol from the original.
+        """
+        key = ('pgf', tol)
+        if key not in self._cache:
+            self._cache[key] = self._toPGF(tol)
+
+        return self._cache[key]
+
+    def _toPGF(self, tol):
         handleString = r"""
-        rgb(%(pos)s pt)=(%(col)s),"""
-        res = "colormap={" + self._name + "}{"
-
-        ii = 0
-        N = self._smpl.shape[1]
-        for ii in range(N):
-            dct = {
-                'pos': float(ii)/(N - 1),
-                'col': ','.join([
-                    str(self._smpl[0, ii]),
-                    str(self._smpl[1, ii]),
-                    str(self._smpl[2, ii])
-                ])
+        rgb(%(pos)s pt)=(%(col)s)"""
+
+        lstKnots = [
+            handleString % {
+                'pos': '%g' % pp,
+                'col': ','.join('%g' % cc for cc in col)
             }
-            res += handleString % (dct)
+            for pp, col in zip(*self._knots(tol))
+        ]
 
-        return res + "}"
+        return "colormap={" + self._name + "}{" + ",".join(lstKnots) + "}"
 
+    def toPGFName(self):
+        r"""
+        Return the pgfplots option selecting the colormap by its name, as
+        defined in a header written by generateHeader.
+        """
+        return "colormap name={" + self._name + "}"
 
-def _compose(
-    theme,          # the theme to use in TeX code
-    dctPlotInfo,    # dictionary containing the extracted image data
+
+class RenderCache:
+    r"""
+    Persistent Render Cache
+
+    This class stores rendered images in a directory, addressed by a hash
+    of everything that influences the pixels, i.e. the data, the colormap
+    and the limits. Passing a cache to the plotting routines skips the
+    rendering entirely, if an identical image has been rendered before.
+    The TeX file is then only rewritten, if its content changed.
+
+    A manifest in the cache directory keeps track of the stored images and
+    the least recently used ones are evicted once the total size exceeds
+    maxSize bytes.
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> cache = ax.RenderCache('.axify-cache', maxSize=2**30)
+    >>> ax.toHeatmap(data, 'data', thme, cmap, cache=cache)
+    """
+
+    _manifestName = 'manifest.json'
+    _lockName = 'manifest.lock'
+
+    @property
+    def path(self):
+        return self._path
+
+    @property
+    def maxSize(self):
+        return self._maxSize
+
+    def __init__(self, path, maxSize=2**30):
+        self._path = path
+        self._maxSize = maxSize
+        os.makedirs(self._path, exist_ok=True)
+
+    @contextlib.contextmanager
+    def _locked(self):
+        # hold an exclusive lock of the manifest, such that processes and
+        # threads sharing the cache never lose each others changes
+        with open(os.path.join(self._path, self._lockName), 'a+b') as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+
+            try:
+                yield
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+                else:
+                    f.seek(0)
+                    msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+    def _load(self):
+        try:
+            with open(os.path.join(self._path, self._manifestName)) as f:
+                return json.load(f)
+        except (IOError, ValueError):
+            return {}
+
+    def _save(self, dctManifest):
+        # write to a temporary file first, such that concurrent readers never
+        # see a partially written manifest
+        manifestPath = os.path.join(self._path, self._manifestName)
+        tmpPath = '%s.%d' % (manifestPath, os.getpid())
+        with open(tmpPath, 'w') as f:
+            json.dump(dctManifest, f, indent=1)
+        os.replace(tmpPath, manifestPath)
+
+    def _blob(self, key):
+        return os.path.join(self._path, key[:2], key)
+
+    def key(self, *args, memBudget=None):
+        r"""
+        Compute the key of a rendering from all of its inputs. Arrays are
+        hashed band-wise by their content, all other arguments by their
+        representation.
+        """
+        h = hashlib.blake2b(digest_size=20)
+        for arg in args:
+            if isinstance(arg, np.ndarray):
+                h.update(repr((arg.dtype.str, arg.shape)).encode())
+                if arg.ndim == 0:
+                    h.update(arg.tobytes())
+                    continue
+
+                numRows = _bandRows(arg, memBudget)
+                for ii in range(0, arg.shape[0], numRows):
+                    h.update(np.ascontiguousarray(arg[ii:ii + numRows]).data)
+            else:
+                h.update(repr(arg).encode())
+
+        return h.hexdigest()
+
+    def fetch(self, key, path):
+        r"""
+        Look up a rendering and place the cached image at path.
+
+        Returns the metadata stored alongside the image or None if there is
+        no such rendering in the cache.
+        """
+        with self._locked():
+            return self._fetch(key, path)
+
+    def _fetch(self, key, path):
+        dctManifest = self._load()
+        if key not in dctManifest or not os.path.isfile(self._blob(key)):
+            return None
+
+        entry = dctManifest[key]
+
+        # only copy the image if the output is not the one we placed there
+        absPath = os.path.abspath(path)
+        try:
+            st = os.stat(path)
+            placed = entry['outputs'].get(absPath) == [
+                st.st_size, st.st_mtime_ns
+            ]
+        except OSError:
+            placed = False
+
+        if not placed:
+            shutil.copyfile(self._blob(key), path)
+            st = os.stat(path)
+            entry['outputs'][absPath] = [st.st_size, st.st_mtime_ns]
+
+        entry['atime'] = time.time()
+        self._save(dctManifest)
+
+        return entry['info']
+
+    def store(self, key, path, info):
+        r"""
+        Put the image at path into the cache and evict the least recently
+        used images until the cache fits into maxSize again.
+        """
+        blobPath = self._blob(key)
+        os.makedirs(os.path.dirname(blobPath), exist_ok=True)
+        tmpPath = '%s.%d.%d' % (blobPath, os.getpid(), threading.get_ident())
+        shutil.copyfile(path, tmpPath)
+        os.replace(tmpPath, blobPath)
+
+        with self._locked():
+            self._store(key, path, info)
+
+    def _store(self, key, path, info):
+        st = os.stat(path)
+        dctManifest = self._load()
+        dctManifest[key] = {
+            'size': os.path.getsize(self._blob(key)),
+            'atime': time.time(),
+            'info': info,
+            'outputs': {os.path.abspath(path): [st.st_size, st.st_mtime_ns]}
+        }
+
+        totalSize = sum(entry['size'] for entry in dctManifest.values())
+        lstKeys = sorted(dctManifest, key=lambda k: dctManifest[k]['atime'])
+        for oldKey in lstKeys:
+            if totalSize <= self._maxSize or oldKey == key:
+                break
+
+            totalSize -= dctManifest[oldKey]['size']
+            del dctManifest[oldKey]
+            try:
+                os.remove(self._blob(oldKey))
+            except OSError:
+                pass
+
+        self._save(dctManifest)
+
+    def clear(self):
+        r"""
+        Remove all images from the cache.
+        """
+        with self._locked():
+            for key in self._load():
+                try:
+                    os.remove(self._blob(key))
+                except OSError:
+                    pass
+
+            self._save({})
+
+
+class Stats:
+    r"""
+    Statistics Class
+
+    This class holds the minimum, maximum, number of NaN entries and a
+    histogram of an array, as computed by computeStats in a single pass
+    over the data. The histogram bins follow the bit pattern of the values
+    in single precision, i.e. every bin spans a fixed relative range of
+    about 0.05%, regardless of the range of the data. This allows to
+    resolve percentiles without sorting and to merge the statistics of
+    several arrays.
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> stats = ax.computeStats(data)
+    >>> stats.limits('p1-p99')
+    """
+
+    # number of low bits of a float32 that are dropped for the histogram
+    _shift = 12
+
+    @property
+    def min(self):
+        return self._min
+
+    @property
+    def max(self):
+        return self._max
+
+    @property
+    def numNaN(self):
+        return self._numNaN
+
+    @property
+    def count(self):
+        return self._count
+
+    @property
+    def histogram(self):
+        return self._hist
+
+    def __init__(
+        self, dataMin=float('inf'), dataMax=-float('inf'), numNaN=0, count=0,
+        hist=None
+    ):
+        self._min = dataMin
+        self._max = dataMax
+        self._numNaN = numNaN
+        self._count = count
+        self._hist = hist
+
+    @classmethod
+    def _keys(cls, arrData):
+        # map the bit patterns of float32 values to unsigned integers with
+        # the same ordering as the values themselves
+        bits = arrData.astype(np.float32).view(np.uint32)
+
+        # flip all bits of negative values, but only the sign of others
+        mask = (bits.view(np.int32) >> 31).view(np.uint32)
+        mask |= 0x80000000
+        bits ^= mask
+        return bits >> cls._shift
+
+    @classmethod
+    def _value(cls, key):
+        # center of the bin with the given key, inverting _keys
+        bits = np.uint32((int(key) << cls._shift) | (1 << (cls._shift - 1)))
+        if bits >= 0x80000000:
+            bits = bits & np.uint32(0x7fffffff)
+        else:
+            bits = ~bits
+        return float(bits.view(np.float32))
+
+    @classmethod
+    def fromArray(cls, arrData, histogram=True):
+        r"""
+        Compute the statistics of an array, which is loaded as a whole.
+        """
+        arrData = np.asarray(arrData).reshape(-1)
+        if np.issubdtype(arrData.dtype, np.inexact):
+            isNaN = np.isnan(arrData)
+            numNaN = np.count_nonzero(isNaN)
+            if numNaN > 0:
+                arrData = arrData[~isNaN]
+        else:
+            numNaN = 0
+
+        if arrData.size == 0:
+            return cls(numNaN=numNaN)
+
+        hist = None
+        if histogram:
+            hist = np.bincount(
+                cls._keys(arrData), minlength=1 << (32 - cls._shift)
+            )
+
+        return cls(
+            np.min(arrData), np.max(arrData), numNaN, arrData.size, hist
+        )
+
+    def merge(self, other):
+        r"""
+        Combine the statistics of two arrays.
+        """
+        # statistics of empty arrays do not carry any histogram
+        if self._count == 0:
+            hist = other.histogram
+        elif other.count == 0:
+            hist = self._hist
+        elif self._hist is None or other.histogram is None:
+            hist = None
+        else:
+            hist = self._hist + other.histogram
+
+        return Stats(
+            min(self._min, other.min),
+            max(self._max, other.max),
+            self._numNaN + other.numNaN,
+            self._count + other.count,
+            hist
+        )
+
+    def save(self, path, tag=[]):
+        r"""
+        Store the statistics in a numpy archive at path. The tag allows to
+        identify the data they belong to when loading them again.
+        """
+        if self._hist is not None:
+            idx = np.flatnonzero(self._hist)
+            counts = self._hist[idx]
+        else:
+            idx = counts = np.zeros(0, dtype=np.int64)
+
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                summary=np.array([self._min, self._max], dtype=np.float64),
+                counts=np.array([self._numNaN, self._count]),
+                hasHist=self._hist is not None,
+                histIdx=idx,
+                histCounts=counts,
+                tag=np.asarray(tag)
+            )
+
+    @classmethod
+    def load(cls, path, tag=None):
+        r"""
+        Load statistics stored via save. Returns None if there are none at
+        path or if they were saved with a different tag.
+        """
+        try:
+            with np.load(path) as f:
+                if tag is not None and (
+                    f['tag'].shape != np.shape(tag) or
+                    np.any(f['tag'] != np.asarray(tag))
+                ):
+                    return None
+
+                hist = None
+                if f['hasHist']:
+                    hist = np.zeros(1 << (32 - cls._shift), dtype=np.int64)
+                    hist[f['histIdx']] = f['histCounts']
+
+                return cls(
+                    f['summary'][0], f['summary'][1],
+                    int(f['counts'][0]), int(f['counts'][1]),
+                    hist
+                )
+        except (IOError, ValueError, KeyError):
+            return None
+
+    def percentile(self, q):
+        r"""
+        Value below which q percent of the non-NaN entries lie, accurate up
+        to the width of a histogram bin.
+        """
+        if self._hist is None:
+            raise ValueError('Statistics were computed without histogram')
+
+        if self._count == 0:
+            return np.nan
+
+        cum = np.cumsum(self._hist)
+        key = np.searchsorted(cum, q / 100.0 * (self._count - 1) + 1)
+        return min(self._max, max(self._min, self._value(key)))
+
+    def limits(self, zLim=[]):
+        r"""
+        Resolve a specification of the data range to two values. zLim may
+        either be an explicit list of two values, an empty list for the
+        full range of the data or a string like 'p1-p99', which selects
+        the range between the first and the 99th percentile. Without any
+        value besides NaN the range of the data is 0 to 1.
+        """
+        if isinstance(zLim, str):
+            match = re.match(r'^p([0-9.]+)-p([0-9.]+)$', zLim)
+            try:
+                lower = float(match.group(1))
+                upper = float(match.group(2))
+            except (AttributeError, ValueError):
+                raise ValueError('Unknown data range ' + zLim)
+
+            if not 0 <= lower <= upper <= 100:
+                raise ValueError(
+                    'Data range %s needs percentiles from 0 to 100 in '
+                    'ascending order' % zLim
+                )
+
+            if self._count == 0:
+                return [0.0, 1.0]
+
+            return [self.percentile(lower), self.percentile(upper)]
+        elif len(zLim) == 0:
+            if self._count == 0:
+                return [0.0, 1.0]
+
+            return [self._min, self._max]
+        else:
+            return list(zLim)
+
+
+def computeStats(
+    arrData, memBudget=None, numThreads=1, histogram=True, transform=None
 ):
+    """
+    Compute minimum, maximum, number of NaN entries and a histogram of an
+    array in a single pass.
 
-    try:
-        # open the file
-        f = open(dctPlotInfo['savePath'] + '.tex', 'w')
-    except IOError:
-        print("Could not write to TeX file %s" + dctPlotInfo['savePath'])
-    else:
-        # write the tikz-snippet
-        f.write(theme.string % (dctPlotInfo))
+    The array is processed in bands of rows, so it may also be a memory
+    mapped array, which is larger than the available memory.
 
-        # clean everything up
-        f.close()
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the data to analyze
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    numThreads=1 : int
+        number of threads processing the bands in parallel
+    histogram=True : bool
+        whether to compute the histogram needed for percentiles
+    transform=None : callable
+        function applied to every band before analyzing it, such that e.g.
+        the magnitude of complex data is analyzed without a copy of the
+        whole array
 
+    Returns
+    -------
+    Stats
+        the statistics of the array
 
-def toHeatmap(
-    arrData,
-    imgPath,
-    theme,
-    colorMap,
-    texPath=None,
-    xLim=[],
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> stats = ax.computeStats(np.load('data.npy', mmap_mode='r'))
+    >>> stats.limits('p0.5-p99.5')
+    """
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+
+    numRows = _bandRows(arrData, memBudget // numThreads)
+
+    def bandStats(ii):
+        band = arrData[ii:ii + numRows]
+        if transform is not None:
+            band = transform(band)
+
+        return Stats.fromArray(band, histogram)
+
+    lstBands = range(0, arrData.shape[0], numRows)
+    res = Stats()
+    if numThreads == 1:
+        for ii in lstBands:
+            res = res.merge(bandStats(ii))
+    else:
+        with concurrent.futures.ThreadPoolExecutor(numThreads) as pool:
+            for bandRes in pool.map(bandStats, lstBands):
+                res = res.merge(bandRes)
+
+    # start from an empty histogram instead of None for empty arrays
+    if histogram and res.histogram is None:
+        res = Stats(
+            res.min, res.max, res.numNaN, 0,
+            np.zeros(1 << (32 - Stats._shift), dtype=np.int64)
+        )
+
+    return res
+
+
+def _statsKey(stats):
+    # precomputed statistics decide on the data range and on the colors of
+    # clipped and NaN entries, so they take part in the key of a rendering
+    if stats is None:
+        return None
+
+    return [
+        float(stats.min), float(stats.max),
+        int(stats.numNaN), int(stats.count)
+    ]
+
+
+# whether to try filtering the scanlines adaptively and the default zlib
+# level of every compression strategy
+_COMPRESSION = {
+    'fast': (False, 1),
+    'small': (True, 9)
+}
+
+# size of the pieces an image is compressed in, independently of the number
+# of threads, such that the result does not depend on it
+_PIECE_BYTES = 2**20
+
+# window size of deflate, i.e. how far back a piece may refer
+_WINDOW_BYTES = 2**15
+
+# number of scanline bytes filtered at once, whose temporaries of the
+# filter candidates do not count towards the working memory of a band
+_FILTER_BYTES = 2**16
+
+
+def _filterRows(arrRows, prevRow, bpp):
+    r"""
+    Filter the scanlines arrRows, each consisting of bytes of pixels with
+    bpp bytes, with the png filter that minimizes the sum of absolute
+    differences per row. prevRow is the unfiltered row above the first one.
+    Returns the filter types and the filtered rows.
+    """
+    x = arrRows.astype(np.int16)
+
+    up = np.empty_like(x)
+    up[0] = prevRow
+    up[1:] = x[:-1]
+
+    left = np.zeros_like(x)
+    left[:, bpp:] = x[:, :-bpp]
+
+    upLeft = np.zeros_like(x)
+    upLeft[:, bpp:] = up[:, :-bpp]
+
+    # the paeth predictor picks whichever neighbour is closest to the
+    # gradient left + up - upLeft
+    pa = np.abs(up - upLeft)
+    pb = np.abs(left - upLeft)
+    pc = np.abs(left + up - 2 * upLeft)
+    paeth = np.where(
+        (pa <= pb) & (pa <= pc), left, np.where(pb <= pc, up, upLeft)
+    )
+    del pa, pb, pc
+
+    def score(arrFiltered):
+        # the filtered bytes interpreted as signed values
+        return np.minimum(arrFiltered, np.negative(arrFiltered)).sum(
+            axis=1, dtype=np.int64
+        )
+
+    types = np.zeros(x.shape[0], dtype=np.uint8)
+    res = arrRows.astype(np.uint8)
+    best = score(res)
+    for filterType, pred in enumerate(
+        [left, up, (left + up) >> 1, paeth], start=1
+    ):
+        filtered = (x - pred).astype(np.uint8)
+        current = score(filtered)
+        better = current < best
+        types[better] = filterType
+        res[better] = filtered[better]
+        best[better] = current[better]
+
+    return types, res
+
+
+def _deflate(data, level, zdict):
+    # compress a piece as raw deflate stream, which ends on a byte boundary
+    # without being final, such that pieces can be concatenated
+    if zdict:
+        comp = zlib.compressobj(
+            level, zlib.DEFLATED, -15, 9, zlib.Z_DEFAULT_STRATEGY, zdict
+        )
+    else:
+        comp = zlib.compressobj(level, zlib.DEFLATED, -15, 9)
+
+    return comp.compress(data) + comp.flush(zlib.Z_SYNC_FLUSH)
+
+
+class _ZlibStream:
+    r"""
+    Zlib stream of png filtered scanlines, as stored in PNG images and in
+    PDF images with the png predictor.
+
+    The scanlines are compressed in pieces, which are primed with the data
+    preceding them and joined into a single zlib stream, so the pieces can
+    be compressed in numThreads threads at once. Several streams may share
+    the threads of pool. The compressed data is passed to sink in order.
+    """
+
+    def __init__(
+        self, sink, rowBytes, bpp,
+        compression='fast', level=None, numThreads=1, pool=None
+    ):
+        if compression not in _COMPRESSION:
+            raise ValueError('Unknown compression ' + compression)
+
+        self._filtering, self._level = _COMPRESSION[compression]
+        if level is not None:
+            self._level = level
+
+        self._sink = sink
+        self._bpp = bpp
+        self._prevRow = np.zeros(rowBytes, dtype=np.uint8)
+        self._adler = 1
+        self._window = b''
+
+        # compressed pieces not passed to the sink yet, in order
+        self._pending = []
+        self._ownPool = pool is None and numThreads > 1
+        if self._ownPool:
+            pool = concurrent.futures.ThreadPoolExecutor(numThreads)
+        self._pool = pool
+        self._numThreads = numThreads
+
+        # the zlib header announcing a 32 KiB window and the level used
+        if self._level in [-1, 6]:
+            flg = 2 << 6
+        elif self._level < 2:
+            flg = 0
+        else:
+            flg = (1 if self._level < 6 else 3) << 6
+        cmf = 0x78
+        flg += 31 - (cmf * 256 + flg) % 31
+        self._sink(bytes([cmf, flg]))
+
+    def _flush(self, numPending):
+        # pass compressed pieces on until at most numPending are left
+        while len(self._pending) > numPending:
+            data = self._pending.pop(0)
+            if self._pool is not None:
+                data = data.result()
+            self._sink(data)
+
+    def _filter(self, arrRows, prevRow, raw):
+        # filter the scanlines into raw a few rows at a time, such that the
+        # temporaries of _filterRows stay small
+        step = max(1, _FILTER_BYTES // arrRows.shape[1])
+        for ii in range(0, arrRows.shape[0], step):
+            raw[ii:ii + step, 0], raw[ii:ii + step, 1:] = _filterRows(
+                arrRows[ii:ii + step],
+                prevRow if ii == 0 else arrRows[ii - 1],
+                self._bpp
+            )
+
+    def write(self, arrRows):
+        r"""
+        Append the scanlines given as array of shape rows x bytes.
+        """
+        numRows = arrRows.shape[0]
+
+        # every scanline is prefixed with its filter type
+        raw = np.empty((numRows, 1 + arrRows.shape[1]), np.uint8)
+        raw[:, 0] = 0
+        raw[:, 1:] = arrRows
+        if self._filtering:
+            # filtering only pays off for smooth images, so compress a
+            # sample of the band both ways and keep the smaller one
+            start = numRows // 2
+            sample = slice(start, start + max(1, _PIECE_BYTES // raw.shape[1]))
+            arrSample = np.empty_like(raw[sample])
+            self._filter(
+                arrRows[sample],
+                arrRows[start - 1] if start > 0 else self._prevRow,
+                arrSample
+            )
+            if len(zlib.compress(
+                np.ascontiguousarray(arrSample[:, 1:]), self._level
+            )) < len(zlib.compress(
+                np.ascontiguousarray(arrRows[sample]), self._level
+            )):
+                self._filter(arrRows, self._prevRow, raw)
+            del arrSample
+
+            self._prevRow = arrRows[-1].copy()
+
+        data = memoryview(raw.reshape(-1))
+        self._adler = zlib.adler32(data, self._adler)
+
+        for ii in range(0, len(data), _PIECE_BYTES):
+            piece = data[ii:ii + _PIECE_BYTES]
+            if self._pool is not None:
+                self._pending.append(self._pool.submit(
+                    _deflate, piece, self._level, self._window
+                ))
+            else:
+                self._pending.append(
+                    _deflate(piece, self._level, self._window)
+                )
+
+            self._window = (
+                self._window[-_WINDOW_BYTES:] + bytes(piece[-_WINDOW_BYTES:])
+            )[-_WINDOW_BYTES:]
+
+            self._flush(2 * self._numThreads)
+
+        # keep the pieces of at most this band in memory
+        self._flush(self._numThreads)
+
+    def close(self):
+        try:
+            self._flush(0)
+
+            # terminate the stream with an empty final block and the checksum
+            self._sink(b'\x03\x00' + struct.pack('>I', self._adler))
+        finally:
+            if self._ownPool:
+                self._pool.shutdown()
+
+
+class _ImageWriter:
+    r"""
+    Base of the image encoders writing 8 bit RGB or RGBA images directly
+    via zlib. Single channel images are written as 8 bit palette images if
+    an N x 4 RGBA palette is given and as grayscale of bitDepth bits
+    otherwise, where transparent is the gray value to show transparent.
+
+    Rows can be passed in several bands, such that the image never has to
+    be present in memory as a whole, and are compressed by a _ZlibStream.
+    The image is written to the file at path, or to path itself if it is a
+    binary file object, which is left open.
+    """
+
+    def __init__(
+        self, path, width, height, channels=3,
+        compression='fast', level=None, numThreads=1, pool=None,
+        palette=None, bitDepth=8, transparent=None
+    ):
+        self._width = width
+        self._height = height
+        self._channels = channels
+        self._bitDepth = bitDepth
+        self._palette = palette
+        self._transparent = transparent
+        self._rows = 0
+        self._streamArgs = dict(
+            compression=compression, level=level,
+            numThreads=numThreads, pool=pool
+        )
+
+        self._ownFile = isinstance(path, str)
+        self._file = open(path, 'wb') if self._ownFile else path
+
+    def _stream(self, sink, channels, bitDepth):
+        return _ZlibStream(
+            sink,
+            self._width * channels * bitDepth // 8,
+            max(1, channels * bitDepth // 8),
+            **self._streamArgs
+        )
+
+    def _scanlines(self, arrRows):
+        # samples of more than 8 bits are stored big endian
+        if self._bitDepth == 16:
+            arrRows = arrRows.astype('>u2').view(np.uint8)
+
+        return arrRows.reshape(arrRows.shape[0], -1)
+
+    def write(self, arrRows):
+        r"""
+        Append rows given as an array of shape rows x width x channels.
+        """
+        if arrRows.shape[0] > 0:
+            self._write(arrRows)
+            self._rows += arrRows.shape[0]
+
+    def close(self):
+        try:
+            if self._rows != self._height:
+                raise ValueError(
+                    'Image expected %d rows, got %d' %
+                    (self._height, self._rows)
+                )
+
+            self._close()
+        finally:
+            if self._ownFile:
+                self._file.close()
+
+
+class _PNGWriter(_ImageWriter):
+    r"""
+    Minimal PNG encoder, see _ImageWriter.
+    """
+
+    _signature = b'\x89PNG\r\n\x1a\n'
+
+    def __init__(self, path, width, height, channels=3, **kwargs):
+        _ImageWriter.__init__(self, path, width, height, channels, **kwargs)
+
+        self._file.write(self._signature)
+        if self._palette is not None:
+            colorType = 3
+        else:
+            colorType = {1: 0, 3: 2, 4: 6}[channels]
+
+        self._chunk(b'IHDR', struct.pack(
+            '>IIBBBBB',
+            width, height,
+            self._bitDepth,
+            colorType,                      # gray, RGB, palette or RGBA
+            0, 0, 0                         # deflate, adaptive, no interlace
+        ))
+
+        if self._palette is not None:
+            self._chunk(b'PLTE', self._palette[:, :3].tobytes())
+
+            # the alpha of all entries up to the last transparent one
+            alpha = self._palette[:, 3]
+            idxAlpha = np.flatnonzero(alpha != 255)
+            if idxAlpha.size > 0:
+                self._chunk(b'tRNS', alpha[:idxAlpha[-1] + 1].tobytes())
+        elif self._transparent is not None:
+            self._chunk(b'tRNS', struct.pack('>H', self._transparent))
+
+        self._zlib = self._stream(
+            lambda data: self._chunk(b'IDAT', data),
+            channels, self._bitDepth
+        )
+
+    def _chunk(self, tag, data):
+        self._file.write(struct.pack('>I', len(data)))
+        self._file.write(tag)
+        self._file.write(data)
+        self._file.write(struct.pack('>I', zlib.crc32(data, zlib.crc32(tag))))
+
+    def _write(self, arrRows):
+        self._zlib.write(self._scanlines(arrRows))
+
+    def _close(self):
+        self._zlib.close()
+        self._chunk(b'IEND', b'')
+
+
+class _PDFWriter(_ImageWriter):
+    r"""
+    Minimal PDF encoder writing a single page showing the image, see
+    _ImageWriter. The image is stored as Flate compressed XObject with the
+    png predictor, such that pdflatex can embed the page without decoding
+    the image. Palette images use an indexed color space. Transparency is
+    stored as soft mask, which is kept compressed in memory until the
+    image is complete.
+    """
+
+    # largest page size most viewers support, in points
+    _maxPage = 14400
+
+    def __init__(self, path, width, height, channels=3, **kwargs):
+        _ImageWriter.__init__(self, path, width, height, channels, **kwargs)
+
+        # offsets are counted from the start of the pdf within the file
+        self._offsets = []
+        self._start = self._file.tell()
+        self._file.write(b'%PDF-1.5\n%\xe2\xe3\xcf\xd3\n')
+
+        # one pixel is one point, unless the page gets too large
+        scale = min(1.0, self._maxPage / max(width, height))
+        content = b'q %g 0 0 %g 0 0 cm /Im0 Do Q' % (
+            width * scale, height * scale
+        )
+
+        self._object(b'<< /Type /Catalog /Pages 2 0 R >>')
+        self._object(b'<< /Type /Pages /Kids [3 0 R] /Count 1 >>')
+        self._object(
+            b'<< /Type /Page /Parent 2 0 R /MediaBox [0 0 %g %g] '
+            b'/Resources << /XObject << /Im0 5 0 R >> >> /Contents 4 0 R >>'
+            % (width * scale, height * scale)
+        )
+        self._object(b'<< /Length %d >>\nstream\n%s\nendstream' % (
+            len(content), content
+        ))
+
+        if self._palette is not None:
+            colorSpace = b'[/Indexed /DeviceRGB %d <%s>]' % (
+                self._palette.shape[0] - 1,
+                self._palette[:, :3].tobytes().hex().encode()
+            )
+            colors = 1
+        elif channels == 1:
+            colorSpace = b'/DeviceGray'
+            colors = 1
+        else:
+            colorSpace = b'/DeviceRGB'
+            colors = 3
+
+        # transparency is either given by the alpha channel, the alpha of
+        # the palette or a single gray value
+        dctMask = b''
+        self._alpha = None
+        if channels == 4 or (
+            self._palette is not None and np.any(self._palette[:, 3] != 255)
+        ):
+            dctMask = b' /SMask 7 0 R'
+            self._alpha = []
+            self._alphaZlib = self._stream(self._alpha.append, 1, 8)
+        elif self._transparent is not None:
+            dctMask = b' /Mask [%d %d]' % (
+                self._transparent, self._transparent
+            )
+
+        self._startObject()
+        self._file.write(
+            b'<< /Type /XObject /Subtype /Image /Width %d /Height %d '
+            b'/ColorSpace %s /BitsPerComponent %d /Filter /FlateDecode '
+            b'/DecodeParms << /Predictor 15 /Colors %d '
+            b'/BitsPerComponent %d /Columns %d >> /Length 6 0 R%s >>\n'
+            b'stream\n' % (
+                width, height, colorSpace, self._bitDepth, colors,
+                self._bitDepth, width, dctMask
+            )
+        )
+
+        self._length = 0
+        self._zlib = self._stream(self._streamData, colors, self._bitDepth)
+
+    def _startObject(self):
+        self._offsets.append(self._file.tell() - self._start)
+        self._file.write(b'%d 0 obj\n' % len(self._offsets))
+
+    def _object(self, data):
+        self._startObject()
+        self._file.write(data + b'\nendobj\n')
+
+    def _streamData(self, data):
+        self._file.write(data)
+        self._length += len(data)
+
+    def _write(self, arrRows):
+        if self._channels == 4:
+            self._zlib.write(self._scanlines(arrRows[..., :3]))
+        else:
+            self._zlib.write(self._scanlines(arrRows))
+
+        if self._alpha is not None:
+            if self._channels == 4:
+                arrAlpha = arrRows[..., 3]
+            else:
+                arrAlpha = self._palette[:, 3][arrRows]
+            self._alphaZlib.write(arrAlpha.reshape(arrAlpha.shape[0], -1))
+
+    def _close(self):
+        self._zlib.close()
+        self._file.write(b'\nendstream\nendobj\n')
+        self._object(b'%d' % self._length)
+
+        if self._alpha is not None:
+            self._alphaZlib.close()
+            self._object(
+                b'<< /Type /XObject /Subtype /Image /Width %d /Height %d '
+                b'/ColorSpace /DeviceGray /BitsPerComponent 8 '
+                b'/Filter /FlateDecode /DecodeParms << /Predictor 15 '
+                b'/Colors 1 /BitsPerComponent 8 /Columns %d >> '
+                b'/Length %d >>\nstream\n%s\nendstream' % (
+                    self._width, self._height, self._width,
+                    sum(len(data) for data in self._alpha),
+                    b''.join(self._alpha)
+                )
+            )
+
+        # the cross reference table of all objects
+        xref = self._file.tell() - self._start
+        self._file.write(b'xref\n0 %d\n0000000000 65535 f \n' % (
+            len(self._offsets) + 1
+        ))
+        for offset in self._offsets:
+            self._file.write(b'%010d 00000 n \n' % offset)
+        self._file.write(
+            b'trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n'
+            % (len(self._offsets) + 1, xref)
+        )
+
+
+# image writers by file format
+_imageWriters = {
+    'png': _PNGWriter,
+    'pdf': _PDFWriter
+}
+
+
+def _quantize(arrData, zLim, N):
+    r"""
+    Map data values to indices into a lookup table as given by
+    ColorMap.lut, i.e. values below and above zLim map to the under and over
+    entries and NaN maps to the bad entry.
+    """
+    # choose the smallest index type that can address the whole table
+    dtype = np.uint8 if N + 3 <= 256 else np.uint16
+
+    if zLim[1] != zLim[0]:
+        scale = N / (zLim[1] - zLim[0])
+    else:
+        scale = 0.0
+
+    mat = np.subtract(arrData, zLim[0], dtype=np.float64)
+    mat *= scale
+
+    # the upper boundary still belongs to the last color
+    mat[mat == N] = N - 1
+
+    res = np.empty(mat.shape, dtype=dtype)
+    with np.errstate(invalid='ignore'):
+        np.clip(mat, -1, N, out=mat)
+        res[...] = mat
+        res[mat < 0] = N
+        res[mat >= N] = N + 1
+    res[np.isnan(mat)] = N + 2
+
+    return res
+
+
+def _bandRows(arrData, memBudget=None):
+    r"""
+    Number of rows of arrData that can be processed at once, such that the
+    working memory stays below memBudget bytes.
+    """
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+
+    rowBytes = max(1, int(np.prod(arrData.shape[1:])))
+    rowBytes *= arrData.dtype.itemsize + _BYTES_PER_PIXEL
+
+    return int(max(1, min(arrData.shape[0], memBudget // rowBytes)))
+
+
+def _tileEdges(num, numTiles):
+    # pixel boundaries of numTiles tiles of about the same size
+    return [num * ii // numTiles for ii in range(numTiles + 1)]
+
+
+def _tileName(imgPath, row, col, tiles):
+    # path of a tile without file extension, tiles are counted from the
+    # top left
+    if tiles == (1, 1):
+        return imgPath
+
+    return '%s-%d-%d' % (imgPath, row, col)
+
+
+def _tileLimits(lim, edges, num):
+    # coordinates of the pixel boundaries edges of an axis of num pixels
+    # spanning lim, exact at the end such that tiles line up with lim
+    return [
+        lim[0] + (lim[1] - lim[0]) * edge / num if edge < num else lim[1]
+        for edge in edges
+    ]
+
+
+def _graphics(lstTiles):
+    r"""
+    The \addplot graphics of all tiles as filled into the tiles variable
+    of a theme.
+    """
+    return '\n'.join([
+        '\\addplot graphics [xmin = %.17g, xmax = %.17g, '
+        'ymin = %.17g, ymax = %.17g] {%s};' % (
+            dctTile['xMin'], dctTile['xMax'],
+            dctTile['yMin'], dctTile['yMax'], dctTile['imagePath']
+        )
+        for dctTile in lstTiles
+    ])
+
+
+def _renderHeatmap(
+    arrData, imgPath, lut, zLim, stats, numRows,
+    compression='fast', level=None, numThreads=1, tiles=(1, 1),
+    pngMode='rgb', imgFormat='png', output=None
+):
+    r"""
+    Write arrData as image of imgFormat to imgPath, color mapped via the
+    lookup table lut of a ColorMap, in bands of numRows rows. The
+    statistics of the data tell which colors are used. If output is a
+    RenderResult, the images are written into it instead.
+
+    With tiles, the image is split into tiles[0] x tiles[1] tiles, which
+    are written to the files named by _tileName in a single pass over the
+    data, compressing all tiles of a row in the same threads.
+
+    With pngMode 'palette' or 'gray16' the data is quantized into indices,
+    which are written directly as palette or grayscale image.
+    """
+    N = lut.shape[0] - 3
+
+    # the under, over and bad entries of the table that are actually used
+    lstSpecial = [
+        N + ii for ii, used in enumerate([
+            stats.min < zLim[0], stats.max > zLim[1], stats.numNaN > 0
+        ]) if used
+    ]
+
+    dctArgs = {}
+    if pngMode == 'rgb':
+        # only write an alpha channel if a transparent color is used
+        usedAlpha = np.append(lut[:N, 3], lut[lstSpecial, 3])
+        numChannels = 4 if np.any(usedAlpha != 255) else 3
+        table = np.ascontiguousarray(lut[:, :numChannels])
+        numLevels = N
+    elif pngMode == 'palette':
+        # the palette holds the regular colors and the used special ones,
+        # where the regular colors are resampled if they do not fit
+        numLevels = min(N, 256 - len(lstSpecial))
+        if numLevels < N:
+            idxColors = ((np.arange(numLevels) + 0.5) * N / numLevels)
+            palette = lut[idxColors.astype(np.intp)]
+        else:
+            palette = lut[:N]
+        dctArgs['palette'] = np.concatenate([palette, lut[lstSpecial]])
+
+        table = np.zeros(numLevels + 3, dtype=np.uint8)
+        table[:numLevels] = np.arange(numLevels)
+        for ii, special in enumerate(lstSpecial):
+            table[numLevels + special - N] = numLevels + ii
+        numChannels = 1
+    elif pngMode == 'gray16':
+        # values below and above the range are clipped, while NaN gets the
+        # largest gray value, which is transparent
+        numLevels = 2**16 - 3
+        table = np.arange(2**16, dtype=np.uint16)
+        table[numLevels] = 0
+        table[numLevels + 1] = numLevels - 1
+        dctArgs['bitDepth'] = 16
+        if stats.numNaN > 0:
+            dctArgs['transparent'] = 2**16 - 1
+        numChannels = 1
+    else:
+        raise ValueError('Unknown png mode ' + pngMode)
+
+    colEdges = _tileEdges(arrData.shape[1], tiles[0])
+    rowEdges = _tileEdges(arrData.shape[0], tiles[1])
+
+    if numThreads > 1:
+        pool = concurrent.futures.ThreadPoolExecutor(numThreads)
+    else:
+        pool = None
+
+    try:
+        for row in range(tiles[1]):
+            lstPNG = [
+                _imageWriters[imgFormat](
+                    _sink(
+                        output,
+                        _tileName(imgPath, row, col, tiles) + '.' + imgFormat
+                    ),
+                    colEdges[col + 1] - colEdges[col],
+                    rowEdges[row + 1] - rowEdges[row],
+                    channels=numChannels,
+                    compression=compression,
+                    level=level,
+                    numThreads=numThreads,
+                    pool=pool,
+                    **dctArgs
+                )
+                for col in range(tiles[0])
+            ]
+
+            # quantize the data band-wise and look the colors up in the
+            # table
+            for ii in range(rowEdges[row], rowEdges[row + 1], numRows):
+                stop = min(ii + numRows, rowEdges[row + 1])
+                with _stage('quantize', imgPath) as stage:
+                    arrRows = table[
+                        _quantize(arrData[ii:stop], zLim, numLevels)
+                    ]
+                    stage.bytes = arrRows.nbytes
+
+                with _stage('encode', imgPath) as stage:
+                    for col, png in enumerate(lstPNG):
+                        png.write(arrRows[:, colEdges[col]:colEdges[col + 1]])
+                    stage.bytes = arrRows.nbytes
+
+            with _stage('encode', imgPath):
+                for png in lstPNG:
+                    png.close()
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+
+# number of lightness levels of complex heatmaps
+_MAG_LEVELS = 256
+
+
+def _magnitude(arrData, dB=False):
+    r"""
+    Magnitude of the complex array arrData, in decibel if dB, where zero
+    magnitudes become -inf.
+    """
+    arrMag = np.abs(arrData)
+    if dB:
+        with np.errstate(divide='ignore'):
+            np.log10(arrMag, out=arrMag)
+        arrMag *= 20
+
+    return arrMag
+
+
+def _magnitudeLimits(stats, zLim, dB, dynamicRange):
+    r"""
+    Resolve zLim to the range of the magnitude of a complex heatmap. In
+    decibel the range defaults to the top dynamicRange dB below the largest
+    magnitude, or below 0 dB if there is no magnitude above zero.
+    """
+    if not dB or len(zLim) > 0:
+        return stats.limits(zLim)
+
+    magMax = stats.max if np.isfinite(stats.max) else 0.0
+    return [magMax - dynamicRange, magMax]
+
+
+def _domainTable(lut):
+    r"""
+    Colors of a complex heatmap for every phase and magnitude level as
+    (N * _MAG_LEVELS + 1) x 4 array, where the phase selects one of the N
+    regular colors of the lookup table lut of a ColorMap and the magnitude
+    scales its lightness from black to the full color. The last entry is
+    the bad color.
+    """
+    N = lut.shape[0] - 3
+    scale = np.arange(_MAG_LEVELS) / (_MAG_LEVELS - 1)
+
+    table = np.empty((N * _MAG_LEVELS + 1, 4), dtype=np.uint8)
+    table[:-1, :3] = np.rint(
+        lut[:N, None, :3] * scale[None, :, None]
+    ).reshape(-1, 3)
+    table[:-1, 3] = 255
+    table[-1] = lut[N + 2]
+
+    return table
+
+
+def _renderComplex(
+    arrData, imgPath, table, magLim, dB, numRows, channels,
+    compression='fast', level=None, numThreads=1, imgFormat='png',
+    output=None
+):
+    r"""
+    Write the complex arrData as image of imgFormat to imgPath or output,
+    colored via _domainTable in bands of numRows rows, where magLim is the
+    range of the magnitude mapped to the lightness.
+    """
+    N = (table.shape[0] - 1) // _MAG_LEVELS
+    table = np.ascontiguousarray(table[:, :channels])
+
+    img = _imageWriters[imgFormat](
+        _sink(output, imgPath + '.' + imgFormat),
+        arrData.shape[1], arrData.shape[0], channels=channels,
+        compression=compression, level=level, numThreads=numThreads
+    )
+    for ii in range(0, arrData.shape[0], numRows):
+        with _stage('quantize', imgPath) as stage:
+            band = arrData[ii:ii + numRows]
+
+            # the lightness level of the magnitude, clipped to the range
+            arrMag = _magnitude(band, dB)
+            isNaN = np.isnan(arrMag)
+            arrMag -= magLim[0]
+            if magLim[1] != magLim[0]:
+                arrMag *= (_MAG_LEVELS - 1) / (magLim[1] - magLim[0])
+            np.clip(arrMag, 0, _MAG_LEVELS - 1, out=arrMag)
+            arrMag[isNaN] = 0
+
+            # the color of the phase, going once around the colormap
+            arrPhase = np.angle(band)
+            arrPhase += np.pi
+            arrPhase *= N / (2 * np.pi)
+            arrPhase[isNaN] = 0
+
+            idx = arrPhase.astype(np.intp)
+            idx %= N
+            idx *= _MAG_LEVELS
+            idx += np.rint(arrMag).astype(np.intp)
+            idx[isNaN] = table.shape[0] - 1
+
+            arrRows = table[idx]
+            stage.bytes = band.nbytes
+
+        with _stage('encode', imgPath) as stage:
+            img.write(arrRows)
+            stage.bytes = arrRows.nbytes
+
+    with _stage('encode', imgPath):
+        img.close()
+
+
+def _pixels(arrPos, lim, num):
+    r"""
+    Map positions within lim to pixel indices 0, ..., num - 1. Positions
+    outside of lim are mapped to -1.
+    """
+    if lim[1] != lim[0]:
+        scale = num / (lim[1] - lim[0])
+    else:
+        scale = 0.0
+
+    pos = (arrPos - lim[0]) * scale
+
+    # the upper boundary still belongs to the last pixel
+    pos[pos == num] = num - 1
+
+    res = np.full(pos.shape, -1, dtype=np.int64)
+    with np.errstate(invalid='ignore'):
+        inside = (pos >= 0) & (pos < num)
+    res[inside] = pos[inside]
+
+    return res
+
+
+def _renderScatter(
+    arrData, imgPath, lut, xLim, yLim, zLim,
+    imgSize, markerSize, composite, memBudget=None,
+    compression='fast', level=None, numThreads=1, imgFormat='png',
+    output=None
+):
+    r"""
+    Rasterize the points of the Nx3 array arrData as discs of markerSize
+    pixels radius into a transparent image of imgSize pixels written to
+    imgPath as imgFormat, or into output if it is a RenderResult.
+    """
+    if composite not in ['last', 'max', 'mean']:
+        raise ValueError('Unknown compositing mode ' + composite)
+
+    with _stage('rasterize', imgPath) as stage:
+        arrRGBA = _rasterize(
+            arrData, lut, xLim, yLim, zLim,
+            imgSize, markerSize, composite, memBudget
+        )
+        stage.bytes = arrData.nbytes
+
+    with _stage('encode', imgPath) as stage:
+        png = _imageWriters[imgFormat](
+            _sink(output, imgPath + '.' + imgFormat),
+            imgSize[0], imgSize[1], channels=4,
+            compression=compression, level=level, numThreads=numThreads
+        )
+        png.write(arrRGBA)
+        png.close()
+        stage.bytes = arrRGBA.nbytes
+
+
+# matplotlib does not guarantee that figures can be drawn in several
+# threads at once
+_matplotlibLock = threading.Lock()
+
+# figure of every thread drawing scatter plots via matplotlib, which is
+# cleared and reused for all of its plots
+_matplotlibFigures = threading.local()
+
+
+def _renderMatplotlib(arrData, imgFile, cmap, imgFormat='png'):
+    r"""
+    Draw the points of the Nx3 array arrData as markers via scatter of
+    matplotlib and write the plot without axes to imgFile, which is either
+    a path or a binary file object.
+
+    The figure belongs to the calling thread and is drawn by an Agg canvas,
+    so neither pyplot, its global current figure nor a GUI backend are
+    involved. Figures of matplotlib refer to themselves and are only freed
+    by the garbage collector, so every thread reuses a single figure with
+    its axes and canvas, such that the memory does not grow with the
+    number of plots.
+    """
+    fig = getattr(_matplotlibFigures, 'figure', None)
+    if fig is None:
+        from matplotlib.figure import Figure
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+        fig = Figure()
+        FigureCanvasAgg(fig)
+        fig.patch.set_alpha(0)
+        fig.add_subplot()
+        _matplotlibFigures.figure = fig
+
+    a = fig.axes[0]
+    try:
+        a.scatter(
+            x=arrData[:, 0],
+            y=arrData[:, 1],
+            s=arrData[:, 2],
+            c=arrData[:, 2],
+            cmap=cmap,
+            linewidths=5
+        )
+        a.set_frame_on(False)
+        a.set_xticks([])
+        a.set_yticks([])
+        a.axis('off')
+
+        with _matplotlibLock:
+            fig.savefig(
+                imgFile,
+                format=imgFormat,
+                transparent=True,
+                bbox_inches='tight',
+                pad_inches=0
+            )
+    finally:
+        a.clear()
+
+
+def _rasterize(
+    arrData, lut, xLim, yLim, zLim,
+    imgSize, markerSize, composite, memBudget=None
+):
+    r"""
+    Return the RGBA image of the points drawn by _renderScatter.
+    """
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+
+    width, height = imgSize
+    pad = markerSize
+
+    # first reduce all points falling onto the same pixel, where the grids
+    # have a margin of markerSize pixels to draw the markers afterwards
+    shape = (height + 2 * pad, width + 2 * pad)
+    if composite == 'last':
+        # remember the index of the last point of every pixel
+        arrOrder = np.full(shape, -1, dtype=np.int64)
+        arrVal = np.full(shape, np.nan)
+    elif composite == 'max':
+        arrVal = np.full(shape, np.nan)
+    else:
+        arrSum = np.zeros(shape)
+        arrNum = np.zeros(shape)
+
+    numPts = _bandRows(arrData, memBudget)
+    for ii in range(0, arrData.shape[0], numPts):
+        chunk = np.asarray(arrData[ii:ii + numPts], dtype=np.float64)
+
+        # images are stored top row first, but the y axis points up
+        pixX = _pixels(chunk[:, 0], xLim, width)
+        pixY = _pixels(chunk[:, 1], yLim, height)
+
+        inside = (pixX >= 0) & (pixY >= 0) & ~np.isnan(chunk[:, 2])
+        lin = (height - 1 - pixY[inside] + pad) * shape[1]
+        lin += pixX[inside] + pad
+        vals = chunk[inside, 2]
+
+        if composite == 'last':
+            arrOrder.flat[lin] = ii + np.flatnonzero(inside)
+            arrVal.flat[lin] = vals
+        elif composite == 'max':
+            np.fmax.at(arrVal.reshape(-1), lin, vals)
+        else:
+            arrSum += np.bincount(lin, vals, arrSum.size).reshape(shape)
+            arrNum += np.bincount(lin, None, arrNum.size).reshape(shape)
+
+    # now draw the markers by combining the pixel grids with copies shifted
+    # by all pixel offsets covered by a single marker
+    offY, offX = np.mgrid[-pad:pad + 1, -pad:pad + 1]
+    inDisc = offX**2 + offY**2 <= pad**2 + pad
+
+    def shifted(arrGrid, dy, dx):
+        return arrGrid[pad + dy:pad + dy + height, pad + dx:pad + dx + width]
+
+    if composite == 'last':
+        imgOrder = shifted(arrOrder, 0, 0).copy()
+        arrImg = shifted(arrVal, 0, 0).copy()
+    elif composite == 'max':
+        arrImg = shifted(arrVal, 0, 0).copy()
+    else:
+        imgSum = np.zeros((height, width))
+        imgNum = np.zeros((height, width))
+
+    for dy, dx in zip(offY[inDisc], offX[inDisc]):
+        if composite == 'last':
+            later = shifted(arrOrder, dy, dx) > imgOrder
+            imgOrder[later] = shifted(arrOrder, dy, dx)[later]
+            arrImg[later] = shifted(arrVal, dy, dx)[later]
+        elif composite == 'max':
+            np.fmax(arrImg, shifted(arrVal, dy, dx), out=arrImg)
+        else:
+            imgSum += shifted(arrSum, dy, dx)
+            imgNum += shifted(arrNum, dy, dx)
+
+    if composite == 'mean':
+        with np.errstate(invalid='ignore'):
+            arrImg = imgSum / imgNum
+
+    # pixels without any marker stay transparent
+    N = lut.shape[0] - 3
+    arrRGBA = lut[_quantize(arrImg, zLim, N)]
+    arrRGBA[np.isnan(arrImg), 3] = 0
+
+    return arrRGBA
+
+
+def _binPoints(
+    arrData, xLim, yLim, imgSize, aggregate, memBudget=None, numThreads=1
+):
+    r"""
+    Reduce the points of the Nx3 array arrData to a grid of imgSize pixels
+    spanning xLim and yLim, top row first, holding the number of points per
+    pixel or the sum, mean or maximum of their values. Pixels without any
+    point are NaN for the mean and the maximum.
+
+    The points are processed in bands, which numThreads threads bin into
+    grids of their own that are combined at the end.
+    """
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+
+    width, height = imgSize
+    size = width * height
+    numPts = _bandRows(arrData, memBudget // numThreads)
+    lstStarts = list(range(0, arrData.shape[0], numPts))
+
+    def binBands(lstBands):
+        # the number of points and the sum or maximum of their values
+        arrNum = np.zeros(size)
+        arrVal = np.full(size, np.nan) if aggregate == 'max' else None
+        if aggregate in ['sum', 'mean']:
+            arrVal = np.zeros(size)
+
+        for ii in lstBands:
+            chunk = np.asarray(arrData[ii:ii + numPts], dtype=np.float64)
+
+            # images are stored top row first, but the y axis points up
+            pixX = _pixels(chunk[:, 0], xLim, width)
+            pixY = _pixels(chunk[:, 1], yLim, height)
+
+            inside = (pixX >= 0) & (pixY >= 0)
+            if aggregate != 'count':
+                inside &= ~np.isnan(chunk[:, 2])
+            lin = (height - 1 - pixY[inside]) * width + pixX[inside]
+
+            if aggregate == 'max':
+                np.fmax.at(arrVal, lin, chunk[inside, 2])
+            else:
+                arrNum += np.bincount(lin, None, size)
+                if arrVal is not None:
+                    arrVal += np.bincount(lin, chunk[inside, 2], size)
+
+        return arrNum, arrVal
+
+    if numThreads > 1:
+        with concurrent.futures.ThreadPoolExecutor(numThreads) as pool:
+            lstRes = list(pool.map(binBands, [
+                lstStarts[ii::numThreads] for ii in range(numThreads)
+            ]))
+    else:
+        lstRes = [binBands(lstStarts)]
+
+    arrNum, arrVal = lstRes[0]
+    for num, val in lstRes[1:]:
+        arrNum += num
+        if aggregate == 'max':
+            np.fmax(arrVal, val, out=arrVal)
+        elif arrVal is not None:
+            arrVal += val
+
+    if aggregate == 'count':
+        arrGrid = arrNum
+    elif aggregate == 'mean':
+        with np.errstate(invalid='ignore'):
+            arrGrid = arrVal / arrNum
+    else:
+        arrGrid = arrVal
+
+    return arrGrid.reshape(height, width)
+
+
+def _decimate(arrData, width, memBudget=None, numThreads=1):
+    r"""
+    Reduce the N x K array arrData, holding K signals of N samples, to the
+    minimum, the maximum and the last value of the samples falling onto
+    each of width pixel columns, where sample i falls onto column
+    i * width // N. NaN samples are left out of minimum and maximum and
+    columns without samples are NaN. Also returns the number of NaN
+    samples.
+
+    The samples are read in bands, where numThreads threads each reduce a
+    contiguous part of them.
+    """
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+
+    # every sample needs a float copy of its values and three indices
+    N, K = arrData.shape
+    numRows = max(1, min(N, memBudget // numThreads // (
+        K * (arrData.dtype.itemsize + 8) + 3 * 8
+    )))
+
+    def decimate(start, stop):
+        arrMin = np.full((width, K), np.nan)
+        arrMax = np.full((width, K), np.nan)
+        arrLast = np.full((width, K), np.nan)
+        numNaN = 0
+        for ii in range(start, stop, numRows):
+            band = np.asarray(
+                arrData[ii:min(ii + numRows, stop)], dtype=np.float64
+            )
+
+            # the samples of a column are contiguous, so they are reduced
+            # between the first samples of all columns in the band
+            cols = np.arange(ii, ii + band.shape[0]) * width // N
+            starts = np.flatnonzero(np.diff(cols)) + 1
+            starts = np.concatenate([[0], starts])
+            idx = cols[starts]
+
+            arrMin[idx] = np.fmin(
+                arrMin[idx], np.fmin.reduceat(band, starts, axis=0)
+            )
+            arrMax[idx] = np.fmax(
+                arrMax[idx], np.fmax.reduceat(band, starts, axis=0)
+            )
+            arrLast[idx] = band[np.append(starts[1:], band.shape[0]) - 1]
+            numNaN += np.count_nonzero(np.isnan(band))
+
+        return arrMin, arrMax, arrLast, numNaN
+
+    edges = [N * ii // numThreads for ii in range(numThreads + 1)]
+    lstParts = [
+        (start, stop) for start, stop in zip(edges[:-1], edges[1:])
+        if stop > start
+    ]
+    if len(lstParts) > 1:
+        with concurrent.futures.ThreadPoolExecutor(numThreads) as pool:
+            lstRes = list(pool.map(lambda part: decimate(*part), lstParts))
+    else:
+        lstRes = [decimate(0, N)]
+
+    # later parts hold the last samples of the columns they cover
+    arrMin, arrMax, arrLast, numNaN = lstRes[0]
+    for (start, stop), (partMin, partMax, partLast, partNaN) in zip(
+        lstParts[1:], lstRes[1:]
+    ):
+        np.fmin(arrMin, partMin, out=arrMin)
+        np.fmax(arrMax, partMax, out=arrMax)
+        cols = slice(start * width // N, (stop - 1) * width // N + 1)
+        arrLast[cols] = partLast[cols]
+        numNaN += partNaN
+
+    return arrMin, arrMax, arrLast, numNaN
+
+
+def _drawLines(arrMin, arrMax, arrLast, zLim, height, lineWidth=1):
+    r"""
+    Return the image of height rows showing the signals reduced by
+    _decimate, where the pixels of signal k are k + 1 and all others 0.
+
+    Every column spans the samples falling onto it and the last sample of
+    the columns before, so the line has no gaps, and the envelope of the
+    signals is kept exactly. Values outside of zLim are not drawn. Lines
+    are lineWidth pixels wide.
+    """
+    width, K = arrMin.shape
+    arange = np.arange(width)[:, None]
+
+    # the last sample before every column, held over columns without any
+    idxLast = np.where(~np.isnan(arrLast), arange, 0)
+    np.maximum.accumulate(idxLast, axis=0, out=idxLast)
+    arrPrev = np.full((width, K), np.nan)
+    arrPrev[1:] = np.take_along_axis(arrLast, idxLast, axis=0)[:-1]
+
+    arrLo = np.fmin(arrMin, arrPrev)
+    arrHi = np.fmax(arrMax, arrPrev)
+
+    # wide lines span the neighbouring columns as well
+    pad = lineWidth // 2
+    if lineWidth > 1:
+        lo = arrLo.copy()
+        hi = arrHi.copy()
+        for offset in range(-pad, lineWidth - pad):
+            src = slice(max(0, offset), width + min(0, offset))
+            dst = slice(max(0, -offset), width + min(0, -offset))
+            np.fmin(lo[dst], arrLo[src], out=lo[dst])
+            np.fmax(hi[dst], arrHi[src], out=hi[dst])
+        arrLo, arrHi = lo, hi
+
+    # rows of the highest and lowest value, the first row is on top
+    scale = height / (zLim[1] - zLim[0]) if zLim[1] != zLim[0] else 0.0
+    with np.errstate(invalid='ignore'):
+        posLo = (arrLo - zLim[0]) * scale
+        posHi = (arrHi - zLim[0]) * scale
+        visible = (posHi >= 0) & (posLo <= height)
+    visible &= ~np.isnan(arrLo)
+
+    # the upper boundary still belongs to the top row
+    def row(pos):
+        pos = np.minimum(np.floor(np.nan_to_num(pos)), height - 1)
+        return height - 1 - pos.astype(np.int64)
+
+    top = row(posHi) - pad
+    bottom = row(posLo) + lineWidth - 1 - pad
+
+    arrImg = np.zeros((height, width), dtype=np.uint8)
+    rows = np.arange(height)[:, None]
+    for kk in range(K):
+        mask = (rows >= top[:, kk]) & (rows <= bottom[:, kk])
+        arrImg[mask & visible[:, kk]] = kk + 1
+
+    return arrImg
+
+
+class _Pooled:
+    r"""
+    Block pooled view of a 2D array, which reduces blocks of factors pixels
+    into one. Rows are only computed once they are requested, such that
+    the full resolution array is never loaded as a whole. Incomplete
+    blocks at the bottom and right border are dropped.
+    """
+
+    def __init__(self, arrData, factors, pooling):
+        if pooling not in ['mean', 'max', 'min', 'minmax', 'stride']:
+            raise ValueError('Unknown pooling mode ' + pooling)
+
+        self._data = arrData
+        self._fy, self._fx = factors
+        self._pooling = pooling
+
+        self.ndim = 2
+        self.shape = (
+            arrData.shape[0] // self._fy,
+            arrData.shape[1] // self._fx
+        )
+        if pooling == 'mean':
+            self.dtype = np.dtype(np.float64)
+        else:
+            self.dtype = arrData.dtype
+
+    def __getitem__(self, idx):
+        start, stop, _ = idx.indices(self.shape[0])
+        fy, fx = self._fy, self._fx
+        width = self.shape[1] * fx
+
+        if self._pooling == 'stride':
+            return np.asarray(self._data[start * fy:stop * fy:fy, :width:fx])
+
+        blocks = np.asarray(self._data[start * fy:stop * fy, :width])
+        blocks = blocks.reshape(stop - start, fy, self.shape[1], fx)
+
+        if self._pooling == 'max':
+            return blocks.max(axis=(1, 3))
+        elif self._pooling == 'min':
+            return blocks.min(axis=(1, 3))
+
+        blockMean = blocks.mean(axis=(1, 3), dtype=np.float64)
+        if self._pooling == 'mean':
+            return blockMean
+
+        # keep whichever extreme deviates more from the mean of the block
+        blockMin = blocks.min(axis=(1, 3))
+        blockMax = blocks.max(axis=(1, 3))
+        return np.where(
+            blockMax - blockMean > blockMean - blockMin, blockMax, blockMin
+        )
+
+
+class RenderResult:
+    r"""
+    In-Memory Rendering
+
+    Collects everything a plot produces when passed as output to toHeatmap
+    or toScatter, or returned by renderHeatmap and renderScatter, instead
+    of writing it to disk: the encoded images keyed by their file names,
+    the TeX code and the values filled into the theme.
+
+    The images are kept in growing in-memory buffers while they are
+    encoded, which images and image expose as read-only memoryviews
+    without copying them, so they can be handed to a socket or a web
+    framework directly. bytes(result.image) gives a copy as bytes.
+
+    Writing the files to disk is left to save, which writes them to the
+    paths they were rendered for.
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> res = ax.renderHeatmap(data, thme, cmap, 'figures/data')
+    >>> res.images.keys()
+    dict_keys(['figures/data.png'])
+    >>> res.tex
+    >>> res.info['dataMax']
+    >>> # write figures/data.png and figures/data.tex
+    >>> res.save()
+    """
+
+    @property
+    def images(self):
+        return {
+            path: buf.getbuffer().toreadonly()
+            for path, buf in self._buffers.items()
+        }
+
+    @property
+    def image(self):
+        if len(self._buffers) != 1:
+            raise ValueError(
+                'Result holds %d images, use images instead' %
+                len(self._buffers)
+            )
+
+        return next(iter(self.images.values()))
+
+    @property
+    def tex(self):
+        return self._tex
+
+    @property
+    def info(self):
+        return self._info
+
+    def __init__(self):
+        self._buffers = {}
+        self._tex = None
+        self._info = None
+
+    def _open(self, path):
+        buf = io.BytesIO()
+        self._buffers[path] = buf
+        return buf
+
+    def save(self):
+        r"""
+        Write the images and the TeX file to the paths they were rendered
+        for.
+        """
+        for path, buf in self._buffers.items():
+            with open(path, 'wb') as f:
+                f.write(buf.getbuffer())
+
+        if self._info is not None:
+            _writeTeX(self._info['savePath'], self._tex)
+
+
+def _checkData(arrData, style):
+    r"""
+    Raise a ValueError if arrData can not be plotted in style, before
+    anything is computed from it.
+    """
+    if arrData.dtype.kind not in ('biufc' if style == 'complex' else 'biuf'):
+        raise ValueError(
+            '%s plots can not show data of type %s' %
+            (style.title(), arrData.dtype)
+        )
+
+    if style in ['scatter', 'density']:
+        if arrData.ndim != 2 or arrData.shape[1] != 3:
+            raise ValueError('The points of a %s plot must be N x 3' % style)
+    elif style == 'lines':
+        if arrData.ndim not in [1, 2] or (
+            arrData.ndim == 2 and arrData.shape[1] > 255
+        ):
+            raise ValueError(
+                'Line plots need N samples of at most 255 signals'
+            )
+    elif style == 'stack':
+        if arrData.ndim != 3:
+            raise ValueError('A stack of frames must be 3D')
+    elif arrData.ndim != 2:
+        raise ValueError('A %s needs 2D data' % {
+            'heatmap': 'heatmap', 'complex': 'complex heatmap'
+        }[style])
+
+
+def _sink(output, path):
+    # where an image of path goes, i.e. the file itself or a buffer
+    return path if output is None else output._open(path)
+
+
+def _writeTeX(savePath, texString):
+    # leave the file untouched if it already has the right content,
+    # such that build tools do not consider the figure as modified
+    try:
+        with open(savePath + '.tex') as f:
+            if f.read() == texString:
+                return
+    except IOError:
+        pass
+
+    # write the tikz-snippet
+    with open(savePath + '.tex', 'w') as f:
+        f.write(texString)
+
+
+def _compose(
+    theme,          # the theme to use in TeX code
+    dctPlotInfo,    # dictionary containing the extracted image data
+    output=None,    # RenderResult to keep the TeX code in instead of a file
+):
+
+    with _stage('compose', dctPlotInfo['savePath']) as stage:
+        texString = theme.render(dctPlotInfo)
+        stage.bytes = len(texString)
+
+        if output is None:
+            _writeTeX(dctPlotInfo['savePath'], texString)
+        else:
+            output._tex = texString
+            output._info = dctPlotInfo
+
+
+def toHeatmap(
+    arrData,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
+    yLim=[],
+    zLim=[],
+    xLabel='x',
+    yLabel='y',
+    themeArgs={},
+    memBudget=None,
+    cache=None,
+    imgSize=None,
+    imgWidth=None,
+    dpi=300,
+    pooling='mean',
+    numThreads=1,
+    stats=None,
+    sharedColorMap=False,
+    compression='fast',
+    compressionLevel=None,
+    tiles=None,
+    pngMode='rgb',
+    imgFormat='png',
+    output=None,
+):
+    """
+    Create a heatmap plot from 2D data.
+
+    The image is rendered in bands of rows, so arrData may also be a memory
+    mapped array (see numpy.load with mmap_mode='r') that is larger than
+    the available memory.
+
+    If the data has more pixels than can be seen in the document, it can
+    be reduced by pooling blocks of pixels via imgSize or imgWidth. Since
+    only complete blocks are kept, xMax and yMin are adjusted to the part
+    of the data that is actually shown.
+
+    Large images can be split into tiles, such that TeX and PDF viewers
+    only need to decode the tiles that are visible. The tiles are written
+    as imgPath-row-column, counted from the top left, and the theme
+    shows them by repeating its \addplot graphics of imagePath for every
+    tile or via the tiles variable.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the actual data to plot. must be 2D.
+    imgPath : string
+        path to save image and text file to, no file-ending
+    theme : Theme
+        teX theme to be used
+    colorMap : Colormap
+        colormap to be used
+    texPath=None : string
+        path to the imagefile where TeX will be able to find it.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range if the x axis
+    yLim=[] : list
+        range of the y axis
+    zLim=[] : list or string
+        range of the data values, or a percentile range like 'p1-p99'
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    cache=None : RenderCache
+        cache to look up the image in before rendering it
+    imgSize=None : tuple
+        maximum width and height of the image in pixels
+    imgWidth=None : float
+        width of the plot in the document in cm, which together with dpi
+        bounds the width of the image, keeping the aspect ratio
+    dpi=300 : int
+        resolution used together with imgWidth
+    pooling='mean' : string
+        how blocks of pixels are reduced, either 'mean', 'max', 'min',
+        'minmax' to keep the more extreme of both or 'stride' to pick
+        every n-th pixel
+    numThreads=1 : int
+        number of threads used for processing the data and compressing
+        the image
+    stats=None : Stats
+        statistics of arrData as computed by computeStats, if left at None
+        they are computed during the call
+    sharedColorMap=False : bool
+        refer to the colormap by name instead of defining it in the TeX
+        file, which requires a header from generateHeader defining it
+    compression='fast' : string
+        either 'fast' to compress the image quickly or 'small' to filter
+        the rows of the image and compress it as small as possible
+    compressionLevel=None : int
+        zlib level from 1 to 9 overriding the one of compression
+    tiles=None : tuple
+        number of tiles along x and y to split the image into
+    pngMode='rgb' : string
+        'rgb' writes the colors as RGB or RGBA image, 'palette' as 8 bit
+        palette image of about a quarter of the size and 'gray16' writes
+        the position within the range of data values as 16 bit grayscale.
+        palette images resample the colormap to fewer colors, if it does
+        not fit into 256 colors together with the under, over and bad
+        colors in use
+    imgFormat='png' : string
+        file format of the image, either 'png' or 'pdf'. a pdf holds the
+        image as compressed stream, which pdflatex embeds without
+        decompressing it again. since imagePath has no file extension,
+        the theme does not change
+    output=None : RenderResult
+        keep the images and the TeX code in this result instead of writing
+        them to disk, see renderHeatmap. can not be combined with cache
+
+    Returns
+    -------
+    dict
+        the values filled into the theme, including statMin, statMax and
+        statNaN, the statistics of the data, and tileInfo, the limits and
+        path of every tile, if the image is split into tiles
+
+    Raises
+    ------
+    ValueError
+        if the arguments or the theme do not fit the data
+    IOError
+        if the image or the TeX file can not be written
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> # create some random data
+    >>> data = np.random.randn(1024, 1024)
+    >>> # load an axify theme
+    >>> thme = ax.Theme('simple.tex')
+    >>> # construct a colormap
+    >>> cmap = ax.ColorMap('hot')
+    >>> # write the png and the tex file
+    >>> ax.toHeatmap(data, 'data', thme, cmap)
+    """
+
+    # fail before rendering, if the theme cannot be filled
+    theme.check(_PLOT_INFO_KEYS.union(themeArgs))
+
+    _checkData(arrData, 'heatmap')
+
+    if compression not in _COMPRESSION:
+        raise ValueError('Unknown compression ' + compression)
+
+    if pngMode not in ['rgb', 'palette', 'gray16']:
+        raise ValueError('Unknown png mode ' + pngMode)
+
+    if imgFormat not in _imageWriters:
+        raise ValueError('Unknown image format ' + imgFormat)
+
+    if output is not None and cache is not None:
+        raise ValueError('A cache can not be used when rendering to memory')
+
+    if imgWidth is not None and int(imgWidth / 2.54 * dpi) < 1:
+        raise ValueError(
+            'imgWidth of %g cm at %g dpi is less than a pixel wide' %
+            (imgWidth, dpi)
+        )
+
+    if imgSize is not None and min(imgSize) < 1:
+        raise ValueError(
+            'imgSize needs at least one pixel per axis, got %d x %d' %
+            tuple(imgSize)
+        )
+
+    if tiles is None:
+        tiles = (1, 1)
+    else:
+        tiles = tuple(tiles)
+        if tiles != (1, 1) and not theme.tileable:
+            raise ValueError(
+                'Theme %s can not show tiles, since it has neither an '
+                '\\addplot graphics of imagePath nor a tiles variable' %
+                theme.path
+            )
+
+    if xLim == []:
+        xLim = [0, arrData.shape[1]]
+
+    if yLim == []:
+        yLim = [0, arrData.shape[0]]
+
+    numRows = _bandRows(arrData, memBudget)
+
+    with _stage('colormap', imgPath):
+        lut = colorMap.lut
+        colorMapString = (
+            colorMap.toPGFName() if sharedColorMap else colorMap.toPGF()
+        )
+
+    # precomputed statistics resolve the data range without a pass over the
+    # data, such that the cache sees the actual limits
+    if stats is not None:
+        zLim = stats.limits(zLim)
+
+    # look for an identical rendering in the cache first, where every tile
+    # is stored on its own
+    dctCached = None
+    if cache is not None:
+        with _stage('cache', imgPath) as stage:
+            key = cache.key(
+                'heatmap', arrData, lut, zLim, _statsKey(stats),
+                imgSize, imgWidth, dpi, pooling,
+                compression, compressionLevel, tiles, pngMode, imgFormat,
+                memBudget=memBudget
+            )
+            dctKeys = {
+                _tileName(imgPath, row, col, tiles) + '.' + imgFormat:
+                    key if tiles == (1, 1) else cache.key(key, row, col)
+                for row in range(tiles[1])
+                for col in range(tiles[0])
+            }
+            lstCached = [
+                cache.fetch(tileKey, path)
+                for path, tileKey in dctKeys.items()
+            ]
+            if None not in lstCached:
+                dctCached = lstCached[0]
+            stage.bytes = arrData.nbytes
+
+    if dctCached is not None:
+        zLim = dctCached['zLim']
+        stats = Stats(*dctCached['stats'])
+    else:
+        with _stage('stats', imgPath) as stage:
+            # the statistics also tell beforehand, if any transparent color
+            # will be used
+            if stats is None:
+                stats = computeStats(
+                    arrData, memBudget, numThreads, isinstance(zLim, str)
+                )
+                stage.bytes = arrData.nbytes
+
+            zLim = stats.limits(zLim)
+
+    # reduce the resolution to what is actually visible in the document
+    factors = [1, 1]
+    if imgWidth is not None:
+        factors[1] = -(-arrData.shape[1] // int(imgWidth / 2.54 * dpi))
+
+        # pool square blocks, but keep at least one row of short arrays
+        factors[0] = min(factors[1], arrData.shape[0])
+    if imgSize is not None:
+        factors[1] = max(factors[1], -(-arrData.shape[1] // imgSize[0]))
+        factors[0] = max(factors[0], -(-arrData.shape[0] // imgSize[1]))
+
+    if factors != [1, 1]:
+        arrImg = _Pooled(arrData, factors, pooling)
+        numRows = max(1, numRows // factors[0])
+
+        # the image only covers the complete blocks, so the x axis ends
+        # earlier and the y axis starts later, since the first row is on top
+        xLim = [xLim[0], xLim[0] + (xLim[1] - xLim[0]) *
+                arrImg.shape[1] * factors[1] / arrData.shape[1]]
+        yLim = [yLim[1] - (yLim[1] - yLim[0]) *
+                arrImg.shape[0] * factors[0] / arrData.shape[0], yLim[1]]
+    else:
+        arrImg = arrData
+
+    if tiles[0] > arrImg.shape[1] or tiles[1] > arrImg.shape[0]:
+        raise ValueError(
+            'Can not split %d x %d pixels into %d x %d tiles' %
+            (arrImg.shape[1], arrImg.shape[0], tiles[0], tiles[1])
+        )
+
+    if texPath is None:
+        texPath = imgPath
+
+    # the axis limits of every tile, where the first row is on top
+    xEdges = _tileLimits(
+        xLim, _tileEdges(arrImg.shape[1], tiles[0]), arrImg.shape[1]
+    )
+    yEdges = _tileLimits(
+        yLim[::-1], _tileEdges(arrImg.shape[0], tiles[1]), arrImg.shape[0]
+    )
+    lstTiles = [
+        {
+            'xMin': xEdges[col],
+            'xMax': xEdges[col + 1],
+            'yMin': yEdges[row + 1],
+            'yMax': yEdges[row],
+            'imagePath': _tileName(texPath, row, col, tiles)
+        }
+        for row in range(tiles[1])
+        for col in range(tiles[0])
+    ]
+
+    dctPlotInfo = {
+        'dataMin': zLim[0],
+        'dataMax': zLim[1],
+        'xMin': xLim[0],
+        'xMax': xLim[1],
+        'xLabel': xLabel,
+        'yMin': yLim[0],
+        'yMax': yLim[1],
+        'yLabel': yLabel,
+        'savePath': imgPath,
+        'imagePath': texPath,
+        'colormap': colorMapString,
+        'statMin': stats.min,
+        'statMax': stats.max,
+        'statNaN': stats.numNaN,
+        'tiles': _graphics(lstTiles)
+    }
+
+    if tiles != (1, 1):
+        dctPlotInfo['tileInfo'] = lstTiles
+
+    dctPlotInfo.update(themeArgs)
+
+    if dctCached is None:
+        # plot image without boundaries and save it to png
+        _renderHeatmap(
+            arrImg, imgPath, lut, zLim, stats, numRows,
+            compression, compressionLevel, numThreads, tiles,
+            pngMode, imgFormat, output
+        )
+
+        if cache is not None:
+            with _stage('cache', imgPath):
+                for path, tileKey in dctKeys.items():
+                    cache.store(tileKey, path, {
+                        'zLim': [float(zLim[0]), float(zLim[1])],
+                        'stats': [
+                            float(stats.min), float(stats.max),
+                            int(stats.numNaN), int(stats.count)
+                        ]
+                    })
+
+    # call the composition function
+    _compose(theme, dctPlotInfo, output)
+
+    return dctPlotInfo
+
+
+def toScatter(
+    arrData,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
+    yLim=[],
+    zLim=[],
+    xLabel='x',
+    yLabel='y',
+    themeArgs={},
+    memBudget=None,
+    cache=None,
+    renderer='raster',
+    imgSize=(1024, 1024),
+    markerSize=2,
+    composite='last',
+    numThreads=1,
+    stats=None,
+    sharedColorMap=False,
+    compression='fast',
+    compressionLevel=None,
+    imgFormat='png',
+    output=None,
+):
+    r"""
+    Create a scatter plot from a Nx3 ndarray, where the first two
+    columns are used as plotting coordinates where the values of the third
+    column are plotted to.
+
+    By default the points are rasterized directly into an image of imgSize
+    pixels spanning exactly xLim and yLim, where every point is drawn as a
+    disc of markerSize pixels radius. Points falling onto the same pixel
+    are composited according to composite.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the actual data to plot. must be of dimension N x 3.
+    imgPath : string
+        path to save image and text file to, no file-ending
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap to be used
+    texPath=None : string
+        path to the imagefile where TeX will be able to find it.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range if the x axis
+    yLim=[] : list
+        range of the y axis
+    zLim=[] : list or string
+        range of the data values, or a percentile range like 'p1-p99'
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    cache=None : RenderCache
+        cache to look up the image in before rendering it
+    renderer='raster' : string
+        either 'raster' or 'matplotlib' to draw the markers via the
+        scatter plot of matplotlib
+    imgSize=(1024, 1024) : tuple
+        width and height of the rasterized image in pixels
+    markerSize=2 : int
+        radius of the rasterized markers in pixels
+    composite='last' : string
+        how overlapping markers are combined when rasterizing, 'last' draws
+        later points on top, 'max' keeps the largest and 'mean' averages
+        the values
+    numThreads=1 : int
+        number of threads used for computing the limits and compressing
+        the rasterized image
+    stats=None : Stats
+        statistics of the third column of arrData as computed by
+        computeStats, if left at None they are computed during the call
+    sharedColorMap=False : bool
+        refer to the colormap by name instead of defining it in the TeX
+        file, which requires a header from generateHeader defining it
+    compression='fast' : string
+        either 'fast' to compress the rasterized image quickly or 'small'
+        to filter its rows and compress it as small as possible
+    compressionLevel=None : int
+        zlib level from 1 to 9 overriding the one of compression
+    imgFormat='png' : string
+        file format of the image, either 'png' or 'pdf'
+    output=None : RenderResult
+        keep the image and the TeX code in this result instead of writing
+        them to disk, see renderScatter. can not be combined with cache
+
+    Returns
+    -------
+    dict
+        the values filled into the theme, including statMin, statMax and
+        statNaN, the statistics of the third column
+
+    Raises
+    ------
+    ValueError
+        if the arguments or the theme do not fit the data
+    IOError
+        if the image or the TeX file can not be written
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> # create some random data
+    >>> data = np.empty((1024,3))
+    >>> data[:,:2] = np.random.uniform(-1, 1, (1024,2))
+    >>> data[:,2] = np.random.randn(1024)
+    >>> # load an axify theme
+    >>> thme = ax.Theme('simple.tex')
+    >>> # construct a colormap
+    >>> cmap = ax.ColorMap('hot')
+    >>> # write the png and the tex file
+    >>> ax.toHeatmap(data, 'data', thme, cmap)
+    """
+
+    # fail before rendering, if the theme cannot be filled
+    theme.check(_PLOT_INFO_KEYS.union(themeArgs))
+
+    _checkData(arrData, 'scatter')
+
+    if renderer not in ['raster', 'matplotlib']:
+        raise ValueError('Unknown renderer ' + renderer)
+
+    if compression not in _COMPRESSION:
+        raise ValueError('Unknown compression ' + compression)
+
+    if imgFormat not in _imageWriters:
+        raise ValueError('Unknown image format ' + imgFormat)
+
+    if output is not None and cache is not None:
+        raise ValueError('A cache can not be used when rendering to memory')
+
+    imgFile = imgPath + '.' + imgFormat
+
+    with _stage('colormap', imgPath):
+        lut = colorMap.lut
+        colorMapString = (
+            colorMap.toPGFName() if sharedColorMap else colorMap.toPGF()
+        )
+
+    # precomputed statistics resolve the data range without a pass over the
+    # data, such that the cache sees the actual limits
+    if stats is not None:
+        zLim = stats.limits(zLim)
+
+    # look for an identical rendering in the cache first
+    dctCached = None
+    if cache is not None:
+        with _stage('cache', imgPath) as stage:
+            key = cache.key(
+                'scatter', arrData, lut, xLim, yLim, zLim, _statsKey(stats),
+                renderer, imgSize, markerSize, composite,
+                compression, compressionLevel, imgFormat,
+                memBudget=memBudget
+            )
+            dctCached = cache.fetch(key, imgFile)
+            stage.bytes = arrData.nbytes
+
+    if dctCached is not None:
+        xLim = dctCached['xLim']
+        yLim = dctCached['yLim']
+        zLim = dctCached['zLim']
+        stats = Stats(*dctCached['stats'])
+    else:
+        with _stage('stats', imgPath) as stage:
+            if xLim == []:
+                xLim = computeStats(
+                    arrData[:, 0], memBudget, numThreads, False
+                ).limits()
+                stage.bytes += arrData.nbytes // 3
+
+            if yLim == []:
+                yLim = computeStats(
+                    arrData[:, 1], memBudget, numThreads, False
+                ).limits()
+                stage.bytes += arrData.nbytes // 3
+
+            if stats is None:
+                stats = computeStats(
+                    arrData[:, 2], memBudget, numThreads,
+                    isinstance(zLim, str)
+                )
+                stage.bytes += arrData.nbytes // 3
+
+            zLim = stats.limits(zLim)
+
+    if texPath is None:
+        texPath = imgPath
+
+    dctPlotInfo = {
+        'dataMin': zLim[0],
+        'dataMax': zLim[1],
+        'xMin': xLim[0],
+        'xMax': xLim[1],
+        'xLabel': xLabel,
+        'yMin': yLim[0],
+        'yMax': yLim[1],
+        'yLabel': yLabel,
+        'savePath': imgPath,
+        'imagePath': texPath,
+        'colormap': colorMapString,
+        'statMin': stats.min,
+        'statMax': stats.max,
+        'statNaN': stats.numNaN,
+        'tiles': _graphics([{
+            'xMin': xLim[0], 'xMax': xLim[1],
+            'yMin': yLim[0], 'yMax': yLim[1],
+            'imagePath': texPath
+        }])
+    }
+
+    dctPlotInfo.update(themeArgs)
+
+    if dctCached is None and renderer == 'raster':
+        _renderScatter(
+            arrData, imgPath, lut,
+            xLim, yLim, zLim, imgSize, markerSize, composite, memBudget,
+            compression, compressionLevel, numThreads, imgFormat, output
+        )
+
+    elif dctCached is None:
+        with _stage('rasterize', imgPath) as stage:
+            _renderMatplotlib(
+                arrData, _sink(output, imgFile), colorMap.obj, imgFormat
+            )
+            stage.bytes = arrData.nbytes
+
+    if dctCached is None and cache is not None:
+        with _stage('cache', imgPath):
+            cache.store(key, imgFile, {
+                'xLim': [float(xLim[0]), float(xLim[1])],
+                'yLim': [float(yLim[0]), float(yLim[1])],
+                'zLim': [float(zLim[0]), float(zLim[1])],
+                'stats': [
+                    float(stats.min), float(stats.max),
+                    int(stats.numNaN), int(stats.count)
+                ]
+            })
+
+    # call the composition function
+    _compose(theme, dctPlotInfo, output)
+
+    return dctPlotInfo
+
+
+def renderHeatmap(arrData, theme, colorMap, imgPath='heatmap', **kwargs):
+    r"""
+    Create a heatmap plot from 2D data in memory.
+
+    Works like toHeatmap, but keeps the encoded images and the TeX code in
+    the returned RenderResult instead of writing them to disk, e.g. to
+    serve them from a web service without temporary files.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the actual data to plot. must be 2D.
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap to be used
+    imgPath='heatmap' : string
+        path the image is named by in the result and in the TeX code,
+        no file-ending
+    **kwargs
+        further arguments of toHeatmap except cache
+
+    Returns
+    -------
+    RenderResult
+        the images, the TeX code and the values filled into the theme
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> res = ax.renderHeatmap(data, thme, cmap, 'figures/data')
+    >>> png = res.image
+    >>> tex = res.tex
+    """
+    output = RenderResult()
+    toHeatmap(arrData, imgPath, theme, colorMap, output=output, **kwargs)
+
+    return output
+
+
+def renderScatter(arrData, theme, colorMap, imgPath='scatter', **kwargs):
+    r"""
+    Create a scatter plot from a Nx3 ndarray in memory.
+
+    Works like toScatter, but keeps the encoded image and the TeX code in
+    the returned RenderResult instead of writing them to disk.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the actual data to plot. must be of dimension N x 3.
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap to be used
+    imgPath='scatter' : string
+        path the image is named by in the result and in the TeX code,
+        no file-ending
+    **kwargs
+        further arguments of toScatter except cache
+
+    Returns
+    -------
+    RenderResult
+        the image, the TeX code and the values filled into the theme
+    """
+    output = RenderResult()
+    toScatter(arrData, imgPath, theme, colorMap, output=output, **kwargs)
+
+    return output
+
+
+def _frameName(imgPath, frame, numFrames):
+    # path of a frame without file extension, numbered with equal width
+    return '%s-%0*d' % (imgPath, len(str(numFrames - 1)), frame)
+
+
+def toHeatmapStack(
+    arrStack,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
+    yLim=[],
+    zLim=[],
+    xLabel='x',
+    yLabel='y',
+    themeArgs={},
+    memBudget=None,
+    cache=None,
+    numThreads=1,
+    stats=None,
+    sharedColorMap=False,
+    compression='fast',
+    compressionLevel=None,
+    pngMode='rgb',
+    imgFormat='png',
+    layout='frames',
+    groupSize=None,
+    frameTitles=None,
+):
+    r"""
+    Create heatmap plots of all frames of a stack of 2D data, which share
+    one color scale.
+
+    The statistics and limits are computed in a single pass over the whole
+    stack and the colormap is prepared once. Then the frames are color
+    mapped and written in numThreads threads at once, each in bands of
+    rows, so arrStack may also be a memory mapped array that is larger than
+    the available memory.
+
+    The images are written as imgPath-frame, numbered from 0 with equal
+    width. With layout 'frames' every frame gets its own TeX file filled
+    from theme, just like written by toHeatmap. With layout 'group' a
+    single TeX file imgPath.tex is written instead, where theme arranges
+    the frames, e.g. in a pgfplots groupplot, via the frames variable,
+    holding a \nextgroupplot and an \addplot graphics for every frame, and
+    groupSize, holding the layout as 'columns by rows'.
+
+    Parameters
+    ----------
+    arrStack : numpy.ndarray
+        the frames to plot. must be 3D, indexed by frame, y and x
+    imgPath : string
+        path to save the images and text files to, no file-ending
+    theme : Theme
+        teX theme to be used for every frame or the whole group
+    colorMap : ColorMap
+        colormap to be used
+    texPath=None : string
+        path to the images where TeX will be able to find them.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range of the x axis
+    yLim=[] : list
+        range of the y axis
+    zLim=[] : list or string
+        range of the data values, or a percentile range like 'p1-p99',
+        shared by all frames
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    cache=None : RenderCache
+        cache to look up the image of every frame in before rendering it
+    numThreads=1 : int
+        number of frames processed at once
+    stats=None : Stats
+        statistics of arrStack as computed by computeStats, if left at None
+        they are computed during the call
+    sharedColorMap=False : bool
+        refer to the colormap by name instead of defining it in the TeX
+        file, which requires a header from generateHeader defining it
+    compression='fast' : string
+        either 'fast' or 'small', see toHeatmap
+    compressionLevel=None : int
+        zlib level from 1 to 9 overriding the one of compression
+    pngMode='rgb' : string
+        'rgb', 'palette' or 'gray16', see toHeatmap
+    imgFormat='png' : string
+        file format of the images, either 'png' or 'pdf'
+    layout='frames' : string
+        either 'frames' to write a TeX file per frame or 'group' to write
+        a single one showing all frames
+    groupSize=None : tuple
+        number of columns and rows of the group, if left at None the
+        frames are arranged in a grid that is about square
+    frameTitles=None : list
+        titles of the frames in the group
+
+    Returns
+    -------
+    list
+        the values filled into the theme for every frame, where statMin,
+        statMax and statNaN are the statistics of the whole stack
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> # 16 frames of random data
+    >>> data = np.random.randn(16, 256, 256)
+    >>> # a theme with a groupplot showing the frames variable
+    >>> thme = ax.Theme('stack.tex')
+    >>> cmap = ax.ColorMap('hot')
+    >>> # write data-00.png, ..., data-15.png and data.tex
+    >>> ax.toHeatmapStack(data, 'data', thme, cmap, layout='group')
+    """
+    if layout not in ['frames', 'group']:
+        raise ValueError('Unknown layout ' + layout)
+
+    # fail before rendering, if the theme cannot be filled
+    theme.check((
+        _PLOT_INFO_KEYS if layout == 'frames' else _GROUP_INFO_KEYS
+    ).union(themeArgs))
+
+    if layout == 'group' and 'frames' not in theme.keys:
+        raise ValueError(
+            'Theme %s can not show a group, since it has no frames variable'
+            % theme.path
+        )
+
+    _checkData(arrStack, 'stack')
+
+    if compression not in _COMPRESSION:
+        raise ValueError('Unknown compression ' + compression)
+
+    if pngMode not in ['rgb', 'palette', 'gray16']:
+        raise ValueError('Unknown png mode ' + pngMode)
+
+    if imgFormat not in _imageWriters:
+        raise ValueError('Unknown image format ' + imgFormat)
+
+    numFrames = arrStack.shape[0]
+
+    if xLim == []:
+        xLim = [0, arrStack.shape[2]]
+
+    if yLim == []:
+        yLim = [0, arrStack.shape[1]]
+
+    if texPath is None:
+        texPath = imgPath
+
+    with _stage('colormap', imgPath):
+        lut = colorMap.lut
+        colorMapString = (
+            colorMap.toPGFName() if sharedColorMap else colorMap.toPGF()
+        )
+
+    with _stage('stats', imgPath) as stage:
+        # one pass over all frames gives the shared color scale
+        if stats is None:
+            stats = computeStats(
+                arrStack, memBudget, numThreads, isinstance(zLim, str)
+            )
+            stage.bytes = arrStack.nbytes
+
+        zLim = stats.limits(zLim)
+
+    # every thread renders a frame within its share of the budget
+    if memBudget is None:
+        memBudget = _MEM_BUDGET
+    numRows = _bandRows(arrStack[0], memBudget // numThreads)
+
+    lstFrames = []
+    for frame in range(numFrames):
+        framePath = _frameName(imgPath, frame, numFrames)
+        frameTexPath = _frameName(texPath, frame, numFrames)
+        dctPlotInfo = {
+            'dataMin': zLim[0],
+            'dataMax': zLim[1],
+            'xMin': xLim[0],
+            'xMax': xLim[1],
+            'xLabel': xLabel,
+            'yMin': yLim[0],
+            'yMax': yLim[1],
+            'yLabel': yLabel,
+            'savePath': framePath,
+            'imagePath': frameTexPath,
+            'colormap': colorMapString,
+            'statMin': stats.min,
+            'statMax': stats.max,
+            'statNaN': stats.numNaN,
+            'tiles': _graphics([{
+                'xMin': xLim[0], 'xMax': xLim[1],
+                'yMin': yLim[0], 'yMax': yLim[1],
+                'imagePath': frameTexPath
+            }])
+        }
+        dctPlotInfo.update(themeArgs)
+        lstFrames.append(dctPlotInfo)
+
+    def render(frame):
+        framePath = lstFrames[frame]['savePath']
+        imgFile = framePath + '.' + imgFormat
+
+        if cache is not None:
+            with _stage('cache', framePath) as stage:
+                key = cache.key(
+                    'stack', arrStack[frame], lut, zLim,
+                    [stats.min < zLim[0], stats.max > zLim[1],
+                     stats.numNaN > 0],
+                    compression, compressionLevel, pngMode, imgFormat,
+                    memBudget=memBudget
+                )
+                stage.bytes = arrStack[frame].nbytes
+                dctCached = cache.fetch(key, imgFile)
+        else:
+            dctCached = None
+
+        if dctCached is None:
+            _renderHeatmap(
+                arrStack[frame], framePath, lut, zLim, stats, numRows,
+                compression, compressionLevel, 1, (1, 1),
+                pngMode, imgFormat
+            )
+
+            if cache is not None:
+                with _stage('cache', framePath):
+                    cache.store(key, imgFile, {})
+
+        if layout == 'frames':
+            _compose(theme, lstFrames[frame])
+
+    if numThreads > 1:
+        with concurrent.futures.ThreadPoolExecutor(numThreads) as pool:
+            list(pool.map(render, range(numFrames)))
+    else:
+        for frame in range(numFrames):
+            render(frame)
+
+    if layout == 'group':
+        if groupSize is None:
+            numCols = int(np.ceil(np.sqrt(numFrames)))
+            groupSize = (numCols, -(-numFrames // numCols))
+
+        lstGroup = []
+        for frame, dctFrame in enumerate(lstFrames):
+            if frameTitles is not None:
+                lstGroup.append(
+                    '\\nextgroupplot[title = {%s}]' % frameTitles[frame]
+                )
+            else:
+                lstGroup.append('\\nextgroupplot')
+            lstGroup.append(dctFrame['tiles'])
+
+        # the group shows the first frame where a single image is expected
+        _compose(theme, dict(
+            lstFrames[0],
+            savePath=imgPath,
+            frames='\n'.join(lstGroup),
+            groupSize='%d by %d' % tuple(groupSize)
+        ))
+
+    return lstFrames
+
+
+def toDensity(
+    arrData,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
+    yLim=[],
+    zLim=[],
+    xLabel='x',
+    yLabel='y',
+    themeArgs={},
+    memBudget=None,
+    imgSize=(1024, 1024),
+    aggregate='count',
+    numThreads=1,
+    **kwargs
+):
+    r"""
+    Create a density plot from a Nx3 ndarray, where the points given by
+    the first two columns are binned into a grid of imgSize pixels, which
+    is shown as heatmap.
+
+    Every pixel holds the number of points falling onto it or the sum, the
+    mean or the maximum of their values in the third column. The points are
+    binned in bands within memBudget, so arrData may also be a memory
+    mapped array of far more points than fit into memory or could be
+    drawn as markers.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the points to bin. must be of dimension N x 3.
+    imgPath : string
+        path to save image and text file to, no file-ending
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap to be used
+    texPath=None : string
+        path to the imagefile where TeX will be able to find it.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range of the x axis, spanned exactly by the grid. if left empty,
+        the range of the points is used
+    yLim=[] : list
+        range of the y axis, spanned exactly by the grid
+    zLim=[] : list or string
+        range of the binned values, or a percentile range like 'p1-p99'
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    imgSize=(1024, 1024) : tuple
+        width and height of the grid in pixels
+    aggregate='count' : string
+        either 'count', 'sum', 'mean' or 'max', where pixels without any
+        point get the bad color of the colormap for 'mean' and 'max'
+    numThreads=1 : int
+        number of threads binning the points and processing the image
+    **kwargs
+        further arguments of toHeatmap, except imgSize, imgWidth, dpi,
+        pooling and stats
+
+    Returns
+    -------
+    dict
+        the values filled into the theme, where statMin, statMax and
+        statNaN are the statistics of the binned values
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> data = np.load('points.npy', mmap_mode='r')
+    >>> thme = ax.Theme('simple.tex')
+    >>> cmap = ax.ColorMap('hot')
+    >>> ax.toDensity(data, 'points', thme, cmap, aggregate='mean')
+    """
+    _checkData(arrData, 'density')
+
+    if aggregate not in ['count', 'sum', 'mean', 'max']:
+        raise ValueError('Unknown aggregate ' + aggregate)
+
+    # fail before binning, if the theme cannot be filled
+    theme.check(_PLOT_INFO_KEYS.union(themeArgs))
+
+    with _stage('stats', imgPath) as stage:
+        if xLim == []:
+            xLim = computeStats(
+                arrData[:, 0], memBudget, numThreads, False
+            ).limits()
+            stage.bytes += arrData.nbytes // 3
+
+        if yLim == []:
+            yLim = computeStats(
+                arrData[:, 1], memBudget, numThreads, False
+            ).limits()
+            stage.bytes += arrData.nbytes // 3
+
+    with _stage('rasterize', imgPath) as stage:
+        arrGrid = _binPoints(
+            arrData, xLim, yLim, imgSize, aggregate, memBudget, numThreads
+        )
+        stage.bytes = arrData.nbytes
+
+    return toHeatmap(
+        arrGrid, imgPath, theme, colorMap,
+        texPath=texPath, xLim=xLim, yLim=yLim, zLim=zLim,
+        xLabel=xLabel, yLabel=yLabel, themeArgs=themeArgs,
+        memBudget=memBudget, numThreads=numThreads, **kwargs
+    )
+
+
+def toLines(
+    arrData,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
+    zLim=[],
+    xLabel='x',
+    yLabel='y',
+    themeArgs={},
+    memBudget=None,
+    cache=None,
+    imgSize=(1024, 512),
+    lineWidth=1,
+    numThreads=1,
+    stats=None,
+    sharedColorMap=False,
+    compression='fast',
+    compressionLevel=None,
+    imgFormat='png',
+    output=None,
+):
+    r"""
+    Create a line plot of one or several long signals.
+
+    The samples are reduced to their minimum and maximum per pixel column
+    of an image of imgSize pixels, which is drawn with the lines spanning
+    them, so the envelope of the signals stays exact no matter how many
+    samples fall onto a pixel. The samples are read in bands, so arrData
+    may also be a memory mapped array that is larger than the available
+    memory.
+
+    Signal k of K is drawn in the color of the colormap at (k + 0.5) / K,
+    later signals on top of earlier ones, into a transparent palette
+    image.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the signals to plot, either a single one of N samples or N x K for
+        K signals
+    imgPath : string
+        path to save image and text file to, no file-ending
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap the colors of the signals are taken from
+    texPath=None : string
+        path to the imagefile where TeX will be able to find it.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range of the x axis, spanned by the samples. if left empty, the
+        samples are numbered from 0 to N
+    zLim=[] : list or string
+        range of the signal values, i.e. of the y axis, or a percentile
+        range like 'p1-p99'. if left empty, the full range is used
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    cache=None : RenderCache
+        cache to look up the image in before rendering it
+    imgSize=(1024, 512) : tuple
+        width and height of the image in pixels
+    lineWidth=1 : int
+        width of the lines in pixels
+    numThreads=1 : int
+        number of threads reducing the samples
+    stats=None : Stats
+        statistics of arrData as computed by computeStats
+    sharedColorMap=False : bool
+        refer to the colormap by name instead of defining it in the TeX
+        file, which requires a header from generateHeader defining it
+    compression='fast' : string
+        either 'fast' or 'small', see toHeatmap
+    compressionLevel=None : int
+        zlib level from 1 to 9 overriding the one of compression
+    imgFormat='png' : string
+        file format of the image, either 'png' or 'pdf'
+    output=None : RenderResult
+        keep the image and the TeX code in this result instead of writing
+        them to disk. can not be combined with cache
+
+    Returns
+    -------
+    dict
+        the values filled into the theme, where dataMin and dataMax equal
+        yMin and yMax, and statMin, statMax and statNaN are the statistics
+        of the samples
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> data = np.load('signal.npy', mmap_mode='r')
+    >>> thme = ax.Theme('simple.tex')
+    >>> cmap = ax.ColorMap('tab10')
+    >>> ax.toLines(data, 'signal', thme, cmap, imgSize=(2048, 512))
+    """
+
+    # fail before rendering, if the theme cannot be filled
+    theme.check(_PLOT_INFO_KEYS.union(themeArgs))
+
+    _checkData(arrData, 'lines')
+
+    if arrData.ndim == 1:
+        arrData = arrData[:, None]
+
+    if compression not in _COMPRESSION:
+        raise ValueError('Unknown compression ' + compression)
+
+    if imgFormat not in _imageWriters:
+        raise ValueError('Unknown image format ' + imgFormat)
+
+    if output is not None and cache is not None:
+        raise ValueError('A cache can not be used when rendering to memory')
+
+    if xLim == []:
+        xLim = [0, arrData.shape[0]]
+
+    imgFile = imgPath + '.' + imgFormat
+
+    with _stage('colormap', imgPath):
+        lut = colorMap.lut
+        colorMapString = (
+            colorMap.toPGFName() if sharedColorMap else colorMap.toPGF()
+        )
+
+    # precomputed statistics resolve the data range without a pass over the
+    # data, such that the cache sees the actual limits
+    if stats is not None:
+        zLim = stats.limits(zLim)
+
+    # look for an identical rendering in the cache first
+    dctCached = None
+    if cache is not None:
+        with _stage('cache', imgPath) as stage:
+            key = cache.key(
+                'lines', arrData, lut, xLim, zLim, _statsKey(stats),
+                imgSize, lineWidth,
+                compression, compressionLevel, imgFormat,
+                memBudget=memBudget
+            )
+            dctCached = cache.fetch(key, imgFile)
+            stage.bytes = arrData.nbytes
+
+    if dctCached is not None:
+        zLim = dctCached['zLim']
+        stats = Stats(*dctCached['stats'])
+    else:
+        # percentiles need a histogram of all samples
+        with _stage('stats', imgPath) as stage:
+            if stats is None and isinstance(zLim, str):
+                stats = computeStats(arrData, memBudget, numThreads)
+                stage.bytes = arrData.nbytes
+
+        with _stage('rasterize', imgPath) as stage:
+            arrMin, arrMax, arrLast, numNaN = _decimate(
+                arrData, imgSize[0], memBudget, numThreads
+            )
+            stage.bytes = arrData.nbytes
+
+            # otherwise the range of the samples is known by now
+            if stats is None:
+                with np.errstate(invalid='ignore'):
+                    stats = Stats(
+                        np.nanmin(arrMin) if numNaN < arrData.size
+                        else np.inf,
+                        np.nanmax(arrMax) if numNaN < arrData.size
+                        else -np.inf,
+                        numNaN, arrData.size - numNaN
+                    )
+            zLim = stats.limits(zLim)
+
+            arrImg = _drawLines(
+                arrMin, arrMax, arrLast, zLim, imgSize[1], lineWidth
+            )
+
+        # transparent background and the opaque colors of the signals
+        numSignals = arrData.shape[1]
+        N = lut.shape[0] - 3
+        palette = np.zeros((numSignals + 1, 4), dtype=np.uint8)
+        palette[1:] = lut[
+            ((np.arange(numSignals) + 0.5) * N / numSignals).astype(np.intp)
+        ]
+        palette[1:, 3] = 255
+
+        with _stage('encode', imgPath) as stage:
+            img = _imageWriters[imgFormat](
+                _sink(output, imgFile), imgSize[0], imgSize[1], channels=1,
+                compression=compression, level=compressionLevel,
+                numThreads=numThreads, palette=palette
+            )
+            img.write(arrImg)
+            img.close()
+            stage.bytes = arrImg.nbytes
+
+        if cache is not None:
+            with _stage('cache', imgPath):
+                cache.store(key, imgFile, {
+                    'zLim': [float(zLim[0]), float(zLim[1])],
+                    'stats': [
+                        float(stats.min), float(stats.max),
+                        int(stats.numNaN), int(stats.count)
+                    ]
+                })
+
+    if texPath is None:
+        texPath = imgPath
+
+    dctPlotInfo = {
+        'dataMin': zLim[0],
+        'dataMax': zLim[1],
+        'xMin': xLim[0],
+        'xMax': xLim[1],
+        'xLabel': xLabel,
+        'yMin': zLim[0],
+        'yMax': zLim[1],
+        'yLabel': yLabel,
+        'savePath': imgPath,
+        'imagePath': texPath,
+        'colormap': colorMapString,
+        'statMin': stats.min,
+        'statMax': stats.max,
+        'statNaN': stats.numNaN,
+        'tiles': _graphics([{
+            'xMin': xLim[0], 'xMax': xLim[1],
+            'yMin': zLim[0], 'yMax': zLim[1],
+            'imagePath': texPath
+        }])
+    }
+
+    dctPlotInfo.update(themeArgs)
+
+    # call the composition function
+    _compose(theme, dctPlotInfo, output)
+
+    return dctPlotInfo
+
+
+def toComplexHeatmap(
+    arrData,
+    imgPath,
+    theme,
+    colorMap,
+    texPath=None,
+    xLim=[],
     yLim=[],
     zLim=[],
     xLabel='x',
     yLabel='y',
     themeArgs={},
+    memBudget=None,
+    cache=None,
+    dB=False,
+    dynamicRange=60,
+    numThreads=1,
+    stats=None,
+    sharedColorMap=False,
+    compression='fast',
+    compressionLevel=None,
+    imgFormat='png',
+    output=None,
+):
+    r"""
+    Create a heatmap plot from complex 2D data via domain coloring.
+
+    The phase of every value selects the color from colorMap, which should
+    be cyclic like 'hsv' or 'twilight', and the magnitude, within zLim,
+    the lightness from black to the full color. Both are computed in bands
+    of rows without copies of the whole array, so arrData may also be a
+    memory mapped array that is larger than the available memory.
+
+    Next to the image, a legend of all colors is written as
+    imgPath-legend, with the phase from -pi to pi along x and the magnitude
+    from zLim[0] to zLim[1] along y. The theme can show it as
+    \addplot graphics of legendPath in an axis spanning phaseMin to
+    phaseMax and magMin to magMax, while colormap shows the phase only.
+
+    Parameters
+    ----------
+    arrData : numpy.ndarray
+        the complex data to plot. must be 2D.
+    imgPath : string
+        path to save image and text file to, no file-ending
+    theme : Theme
+        teX theme to be used
+    colorMap : ColorMap
+        colormap the phase is mapped to
+    texPath=None : string
+        path to the imagefile where TeX will be able to find it.
+        if left at None, texPath=imgPath is assumed
+    xLim=[] : list
+        range if the x axis
+    yLim=[] : list
+        range of the y axis
+    zLim=[] : list or string
+        range of the magnitude, in decibel if dB, or a percentile range
+        like 'p1-p99'. if left empty, the full range is used, or the
+        topmost dynamicRange decibel with dB
+    xLabel='x' : string
+        label on the x axis
+    yLabel='y' : string
+        label on the y axis
+    memBudget=None : int
+        upper bound of the working memory in bytes, if left at None
+        256 MiB are used
+    cache=None : RenderCache
+        cache to look up the image in before rendering it
+    dB=False : bool
+        show the magnitude in decibel, i.e. 20 log10 of it
+    dynamicRange=60 : float
+        range of the magnitude in decibel shown by default
+    numThreads=1 : int
+        number of threads used for computing the limits and compressing
+        the image
+    stats=None : Stats
+        statistics of the magnitude of arrData, in decibel if dB
+    sharedColorMap=False : bool
+        refer to the colormap by name instead of defining it in the TeX
+        file, which requires a header from generateHeader defining it
+    compression='fast' : string
+        either 'fast' or 'small', see toHeatmap
+    compressionLevel=None : int
+        zlib level from 1 to 9 overriding the one of compression
+    imgFormat='png' : string
+        file format of the image and the legend, either 'png' or 'pdf'
+    output=None : RenderResult
+        keep the images and the TeX code in this result instead of writing
+        them to disk. can not be combined with cache
+
+    Returns
+    -------
+    dict
+        the values filled into the theme, where dataMin and dataMax as well
+        as magMin and magMax are the range of the magnitude and phaseMin
+        and phaseMax the one of the phase in radians. statMin, statMax and
+        statNaN are the statistics of the magnitude
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> import numpy as np
+    >>> x = np.linspace(-2, 2, 1024)
+    >>> data = (x[None, :] + 1j * x[:, None])**3 - 1
+    >>> thme = ax.Theme('complex.tex')
+    >>> cmap = ax.ColorMap('hsv')
+    >>> ax.toComplexHeatmap(data, 'data', thme, cmap, dB=True)
+    """
+
+    # fail before rendering, if the theme cannot be filled
+    theme.check(_COMPLEX_INFO_KEYS.union(themeArgs))
+
+    _checkData(arrData, 'complex')
+
+    if compression not in _COMPRESSION:
+        raise ValueError('Unknown compression ' + compression)
+
+    if imgFormat not in _imageWriters:
+        raise ValueError('Unknown image format ' + imgFormat)
+
+    if output is not None and cache is not None:
+        raise ValueError('A cache can not be used when rendering to memory')
+
+    if xLim == []:
+        xLim = [0, arrData.shape[1]]
+
+    if yLim == []:
+        yLim = [0, arrData.shape[0]]
+
+    if texPath is None:
+        texPath = imgPath
+
+    imgFile = imgPath + '.' + imgFormat
+
+    with _stage('colormap', imgPath):
+        lut = colorMap.lut
+        colorMapString = (
+            colorMap.toPGFName() if sharedColorMap else colorMap.toPGF()
+        )
+        table = _domainTable(lut)
+
+    # precomputed statistics resolve the data range without a pass over the
+    # data, such that the cache sees the actual limits
+    if stats is not None:
+        zLim = _magnitudeLimits(stats, zLim, dB, dynamicRange)
+
+    # look for an identical rendering in the cache first
+    dctCached = None
+    if cache is not None:
+        with _stage('cache', imgPath) as stage:
+            key = cache.key(
+                'complex', arrData, lut, zLim, _statsKey(stats),
+                dB, dynamicRange,
+                compression, compressionLevel, imgFormat,
+                memBudget=memBudget
+            )
+            dctCached = cache.fetch(key, imgFile)
+            stage.bytes = arrData.nbytes
+
+    if dctCached is not None:
+        zLim = dctCached['zLim']
+        stats = Stats(*dctCached['stats'])
+    else:
+        with _stage('stats', imgPath) as stage:
+            if stats is None:
+                stats = computeStats(
+                    arrData, memBudget, numThreads, isinstance(zLim, str),
+                    lambda band: _magnitude(band, dB)
+                )
+                stage.bytes = arrData.nbytes
+
+            zLim = _magnitudeLimits(stats, zLim, dB, dynamicRange)
+
+        # only write an alpha channel if the bad color is transparent
+        channels = 4 if stats.numNaN > 0 and table[-1, 3] != 255 else 3
+
+        # the magnitude and phase of a band need twice the working memory
+        numRows = _bandRows(
+            arrData, (_MEM_BUDGET if memBudget is None else memBudget) // 2
+        )
+        _renderComplex(
+            arrData, imgPath, table, zLim, dB, numRows, channels,
+            compression, compressionLevel, numThreads, imgFormat, output
+        )
+
+        if cache is not None:
+            with _stage('cache', imgPath):
+                cache.store(key, imgFile, {
+                    'zLim': [float(zLim[0]), float(zLim[1])],
+                    'stats': [
+                        float(stats.min), float(stats.max),
+                        int(stats.numNaN), int(stats.count)
+                    ]
+                })
+
+    # the legend only depends on the colormap, with the largest magnitude
+    # in the top row
+    with _stage('encode', imgPath):
+        N = lut.shape[0] - 3
+        img = _imageWriters[imgFormat](
+            _sink(output, imgPath + '-legend.' + imgFormat),
+            N, _MAG_LEVELS, channels=3,
+            compression=compression, level=compressionLevel
+        )
+        img.write(
+            table[:-1, :3].reshape(N, _MAG_LEVELS, 3)[:, ::-1]
+            .transpose(1, 0, 2)
+        )
+        img.close()
+
+    dctPlotInfo = {
+        'dataMin': zLim[0],
+        'dataMax': zLim[1],
+        'xMin': xLim[0],
+        'xMax': xLim[1],
+        'xLabel': xLabel,
+        'yMin': yLim[0],
+        'yMax': yLim[1],
+        'yLabel': yLabel,
+        'savePath': imgPath,
+        'imagePath': texPath,
+        'colormap': colorMapString,
+        'statMin': stats.min,
+        'statMax': stats.max,
+        'statNaN': stats.numNaN,
+        'tiles': _graphics([{
+            'xMin': xLim[0], 'xMax': xLim[1],
+            'yMin': yLim[0], 'yMax': yLim[1],
+            'imagePath': texPath
+        }]),
+        'magMin': zLim[0],
+        'magMax': zLim[1],
+        'phaseMin': -np.pi,
+        'phaseMax': np.pi,
+        'legendPath': texPath + '-legend'
+    }
+
+    dctPlotInfo.update(themeArgs)
+
+    # call the composition function
+    _compose(theme, dctPlotInfo, output)
+
+    return dctPlotInfo
+
+
+def generateHeader(
+    path,
+    colorMaps=[],
+):
+    """Generate TeX-File to be used as include for the axify dependencies
+
+    The header may also define colormaps, such that plots can refer to them
+    by name instead of repeating their definition, see sharedColorMap of
+    toHeatmap and toScatter.
+
+    Parameters
+    ----------
+    path : string
+        path to save the file to
+    colorMaps=[] : list
+        ColorMap instances to define in the header
+
+    Examples
+    --------
+    >>> import axify as ax
+    >>> ax.generateHeader('axify', [ax.ColorMap('hot')])
+
+    This generates a file ``axify.tex`` containing the necessary
+    package includes for TeX and the definition of the 'hot' colormap.
+    An OSError is raised if the file can not be written.
+    """
+
+    depString = r"""% axify dependencies
+\usepackage{pgfplots}
+\pgfplotsset{compat=1.15}
+\usepgfplotslibrary{colormaps}
+    """
+
+    for colorMap in colorMaps:
+        depString += "\n\\pgfplotsset{" + colorMap.toPGF() + "}\n"
+
+    with open(path + '.tex', 'w') as f:
+        f.write(depString)
+
+
+# plotting styles, which can be selected by name
+plotFunctions = {
+    'heatmap': toHeatmap,
+    'scatter': toScatter,
+    'stack': toHeatmapStack,
+    'density': toDensity,
+    'lines': toLines,
+    'complex': toComplexHeatmap
+}
+
+# theme and colormap shared by all files rendered in a worker process
+_workerState = {}
+
+
+def _themeKeys(style, kwargs):
+    # the values the plotting routine of style called with kwargs fills into
+    # a theme
+    if style == 'complex':
+        keys = _COMPLEX_INFO_KEYS
+    elif kwargs.get('layout') == 'group':
+        keys = _GROUP_INFO_KEYS
+    else:
+        keys = _PLOT_INFO_KEYS
+
+    return keys.union(kwargs.get('themeArgs', {}))
+
+
+def _initWorker(theme, colorMap):
+    _workerState['theme'] = theme
+    _workerState['colorMap'] = colorMap
+
+
+def _mapFile(imgPath):
+    # memory map the array, such that it is only read in bands
+    with _stage('load', imgPath) as stage:
+        arrData = np.load(imgPath + '.npy', mmap_mode='r')
+        stage.bytes = arrData.nbytes
+
+    return arrData
+
+
+def _statsFile(imgPath, style, memBudget):
+    # files the plot would reject do not take part in a shared scale
+    arrData = _mapFile(imgPath)
+    _checkData(arrData, style)
+
+    # the values of scatter plots are in the third column
+    if style == 'scatter':
+        arrData = arrData[:, 2]
+
+    # reuse the statistics stored next to the file, as long as the file
+    # did not change since
+    st = os.stat(imgPath + '.npy')
+    tag = [st.st_size, st.st_mtime_ns]
+    stats = Stats.load(imgPath + '.stats.npz', tag)
+    if stats is None:
+        with _stage('stats', imgPath) as stage:
+            stats = computeStats(arrData, memBudget)
+            stats.save(imgPath + '.stats.npz', tag)
+            stage.bytes = arrData.nbytes
+
+    return stats
+
+
+def _renderFile(imgPath, style, kwargs):
+    return plotFunctions[style](
+        _mapFile(imgPath),
+        imgPath,
+        _workerState['theme'],
+        colorMap=_workerState['colorMap'],
+        **kwargs
+    )
+
+
+def _runFiles(pool, function, dctArgs, dctErrors):
+    r"""
+    Call function with the arguments given for every path, either in the
+    calling process or in the worker pool. Returns the results keyed by
+    path and puts raised exceptions into dctErrors.
+    """
+    dctRes = {}
+    if pool is None:
+        for imgPath, args in dctArgs.items():
+            try:
+                dctRes[imgPath] = function(*args)
+            except Exception as e:
+                dctErrors[imgPath] = e
+    else:
+        dctFutures = {
+            pool.submit(function, *args): imgPath
+            for imgPath, args in dctArgs.items()
+        }
+        for future in concurrent.futures.as_completed(dctFutures):
+            try:
+                dctRes[dctFutures[future]] = future.result()
+            except Exception as e:
+                dctErrors[dctFutures[future]] = e
+
+    return dctRes
+
+
+def renderBatch(
+    lstPaths,
+    style,
+    theme,
+    colorMap,
+    numWorkers=None,
+    sharedScale=False,
+    **kwargs
 ):
     """
-    Create a heatmap plot from 2D data.
+    Axify a batch of saved numpy arrays in parallel worker processes.
+
+    The theme and the colormap are sent to every worker only once. Errors
+    do not stop the batch, but are collected and returned instead.
+
+    With sharedScale, all plots share one color scale. It is determined
+    from the statistics of all files, which are computed in parallel
+    beforehand and stored next to each file as *.stats.npz, such that
+    later runs only analyze files that changed.
 
     Parameters
     ----------
-    arrData : numpy.ndarray
-        the actual data to plot. must be 2D.
-    imgPath : string
-        path to save image and text file to, no file-ending
+    lstPaths : list
+        paths to the *.npy files without the file extension. the outputs
+        are written next to them
+    style : string
+        plotting style, i.e. one of the keys of plotFunctions
     theme : Theme
         teX theme to be used
-    colorMap : Colormap
+    colorMap : ColorMap
         colormap to be used
-    texPath=None : string
-        path to the imagefile where TeX will be able to find it.
-        if left at None, texPath=imgPath is assumed
-    xLim=[] : list
-        range if the x axis
-    yLim=[] : list
-        range of the y axis
-    zLim=[] : list
-        range of the data values
-    xLabel='x' : string
-        label on the x axis
-    yLabel='y' : string
-        label on the y axis
+    numWorkers=None : int
+        number of worker processes, if left at None all cores are used.
+        a value of 1 renders in the calling process
+    sharedScale=False : bool
+        whether to use the same range of data values for all plots. the
+        range is selected from all data via zLim, e.g. zLim='p1-p99'
+    **kwargs
+        further arguments passed to the plotting function, e.g. memBudget,
+        which then applies to each worker
+
+    Returns
+    -------
+    dict
+        the exceptions raised while processing, keyed by path
 
     Examples
     --------
     >>> import axify as ax
-    >>> import numpy as np
-    >>> # create some random data
-    >>> data = np.random.randn(1024, 1024)
-    >>> # load an axify theme
     >>> thme = ax.Theme('simple.tex')
-    >>> # construct a colormap
     >>> cmap = ax.ColorMap('hot')
-    >>> # write the png and the tex file
-    >>> ax.toHeatmap(data, 'data', thme, cmap)
+    >>> ax.renderBatch(['data1', 'data2'], 'heatmap', thme, cmap, 4)
+    {}
     """
+    if style not in plotFunctions:
+        raise NotImplementedError(style)
 
-    if xLim == []:
-        xLim = [0, arrData.shape[1]]
+    # the statistics of the files do not tell the range of binned values or
+    # of magnitudes
+    if sharedScale and style in ['density', 'complex']:
+        raise ValueError('%s plots can not share a scale' % style.title())
 
-    if yLim == []:
-        yLim = [0, arrData.shape[0]]
+    # fail before starting any worker, if the theme cannot be filled
+    theme.check(_themeKeys(style, kwargs))
 
-    if zLim == []:
-        zLim = [np.min(arrData), np.max(arrData)]
+    if numWorkers is None:
+        numWorkers = os.cpu_count()
 
-    if texPath is None:
-        texPath = imgPath
+    dctErrors = {}
 
-    dctPlotInfo = {
-        'dataMin': zLim[0],
-        'dataMax': zLim[1],
-        'xMin': xLim[0],
-        'xMax': xLim[1],
-        'xLabel': xLabel,
-        'yMin': yLim[0],
-        'yMax': yLim[1],
-        'yLabel': yLabel,
-        'savePath': imgPath,
-        'imagePath': texPath,
-        'colormap': colorMap.toPGF()
-    }
+    if numWorkers == 1 or len(lstPaths) <= 1:
+        _initWorker(theme, colorMap)
+        pool = None
+    else:
+        pool = concurrent.futures.ProcessPoolExecutor(
+            max_workers=min(numWorkers, len(lstPaths)),
+            initializer=_initWorker,
+            initargs=(theme, colorMap)
+        )
 
-    dctPlotInfo.update(themeArgs)
+    def run(function, dctArgs):
+        if pool is None or not _profiles:
+            return _runFiles(pool, function, dctArgs, dctErrors)
 
-    mat = arrData - zLim[0]
-    mat /= (zLim[1] - zLim[0])
+        # profile the workers as well and pass their stages on to the
+        # active profiles
+        traceMemory = any(profile.traceMemory for profile in _profiles)
+        dctRes = _runFiles(pool, _profiled, {
+            imgPath: (traceMemory, function) + args
+            for imgPath, args in dctArgs.items()
+        }, dctErrors)
+
+        for res, dctStages in dctRes.values():
+            for profile in _profiles:
+                profile._merge(dctStages)
+
+        return {imgPath: res for imgPath, (res, _) in dctRes.items()}
 
     try:
-        # plot image without boundaries and save it to png
-        plt.imsave(
-            fname=imgPath + '.png',
-            arr=255*mat,
-            cmap=colorMap.obj,
-            vmin=0,
-            vmax=255
-        )
-    except:
-        print("Could not write to image file %s" % imgPath)
-    else:
-        # call the composition function
-        _compose(theme, dctPlotInfo)
+        dctKwargs = {imgPath: kwargs for imgPath in lstPaths}
 
+        if sharedScale:
+            dctStats = run(_statsFile, {
+                imgPath: (imgPath, style, kwargs.get('memBudget'))
+                for imgPath in lstPaths
+            })
 
-def toScatter(
-    arrData,
-    imgPath,
+            stats = Stats()
+            for fileStats in dctStats.values():
+                stats = stats.merge(fileStats)
+
+            # every file still gets its own statistics without histogram,
+            # such that it does not need to compute them again
+            zLim = stats.limits(kwargs.get('zLim', []))
+            dctKwargs = {
+                imgPath: dict(kwargs, zLim=zLim, stats=Stats(
+                    fileStats.min, fileStats.max,
+                    fileStats.numNaN, fileStats.count
+                ))
+                for imgPath, fileStats in dctStats.items()
+            }
+
+        run(_renderFile, {
+            imgPath: (imgPath, style, fileKwargs)
+            for imgPath, fileKwargs in dctKwargs.items()
+        })
+    finally:
+        if pool is not None:
+            pool.shutdown()
+
+    return dctErrors
+
+
+def watch(
+    lstPaths,
+    style,
     theme,
     colorMap,
-    texPath=None,
-    xLim=[],
-    yLim=[],
-    zLim=[],
-    xLabel='x',
-    yLabel='y',
-    themeArgs={}
+    colorfy=None,
+    interval=1.0,
+    debounce=0.5,
+    numWorkers=2,
+    **kwargs
 ):
-    r"""
-    Create a scatter plot from a Nx3 ndarray, where the first two
-    columns are used as plotting coordinates where the values of the third
-    column are plotted to.
+    """
+    Axify a batch of saved numpy arrays and keep doing so whenever they
+    change, until interrupted.
+
+    The files are polled every interval seconds and a file is only axified
+    again, once it did not change for debounce seconds, such that files
+    that are still being written are not rendered several times. Changes
+    of the theme only lead to rewriting the TeX files, while changes of
+    the colorfy workspace render all plots again.
 
     Parameters
     ----------
-    arrData : numpy.ndarray
-        the actual data to plot. must be of dimension N x 3.
-    imgPath : string
-        path to save image and text file to, no file-ending
+    lstPaths : list
+        paths to the *.npy files without the file extension
+    style : string
+        plotting style, i.e. one of the keys of plotFunctions
     theme : Theme
         teX theme to be used
     colorMap : ColorMap
         colormap to be used
-    texPath=None : string
-        path to the imagefile where TeX will be able to find it.
-        if left at None, texPath=imgPath is assumed
-    xLim=[] : list
-        range if the x axis
-    yLim=[] : list
-        range of the y axis
-    zLim=[] : list
-        range of the data values
-    xLabel='x' : string
-        label on the x axis
-    yLabel='y' : string
-        label on the y axis
-
-    Returns
-    -------
+    colorfy=None : string
+        path of the colorfy workspace colorMap was loaded from, if any
+    interval=1.0 : float
+        time between checking the files for changes in seconds
+    debounce=0.5 : float
+        time a file must stay unchanged before it is axified in seconds
+    numWorkers=2 : int
+        number of worker processes
+    **kwargs
+        further arguments passed to the plotting function
 
     Examples
     --------
     >>> import axify as ax
-    >>> import numpy as np
-    >>> # create some random data
-    >>> data = np.empty((1024,3))
-    >>> data[:,:2] = np.random.uniform(-1, 1, (1024,2))
-    >>> data[:,2] = np.random.randn(1024)
-    >>> # load an axify theme
     >>> thme = ax.Theme('simple.tex')
-    >>> # construct a colormap
     >>> cmap = ax.ColorMap('hot')
-    >>> # write the png and the tex file
-    >>> ax.toHeatmap(data, 'data', thme, cmap)
+    >>> ax.watch(['data1', 'data2'], 'heatmap', thme, cmap)
     """
+    if style not in plotFunctions:
+        raise NotImplementedError(style)
 
-    if xLim == []:
-        xLim = [np.min(arrData[:, 0]), np.max(arrData[:, 0])]
+    theme.check(_themeKeys(style, kwargs))
 
-    if yLim == []:
-        yLim = [np.min(arrData[:, 1]), np.max(arrData[:, 1])]
+    def mtime(path):
+        try:
+            return os.stat(path).st_mtime_ns
+        except OSError:
+            return None
 
-    if zLim == []:
-        zLim = [np.min(arrData), np.max(arrData)]
+    # all watched files with their last seen modification time
+    lstWatched = [imgPath + '.npy' for imgPath in lstPaths] + [theme.path]
+    if colorfy is not None:
+        lstWatched.append(colorfy + '.json')
+    dctSeen = {path: mtime(path) for path in lstWatched}
 
-    if texPath is None:
-        texPath = imgPath
+    # files that changed, with the time their last change was noticed
+    dctPending = {}
 
-    dctPlotInfo = {
-        'dataMin': np.min(arrData[:, 2]),
-        'dataMax': np.max(arrData[:, 2]),
-        'xMin': xLim[0],
-        'xMax': xLim[1],
-        'xLabel': xLabel,
-        'yMin': yLim[0],
-        'yMax': yLim[1],
-        'yLabel': yLabel,
-        'savePath': imgPath,
-        'imagePath': texPath,
-        'colormap': colorMap.toPGF()
-    }
+    # values filled into the theme at the last rendering of every file
+    dctInfo = {}
 
-    # plot image without boundaries and save it to png
-    plt.scatter(
-        x=arrData[:, 0],
-        y=arrData[:, 1],
-        s=arrData[:, 2],
-        c=arrData[:, 2],
-        cmap=colorMap.obj,
-        linewidths=5
-    )
+    lstRender = list(lstPaths)
+    rewriteTeX = False
+    pool = None
+    try:
+        while True:
+            if lstRender:
+                if numWorkers == 1:
+                    _initWorker(theme, colorMap)
+                elif pool is None:
+                    pool = concurrent.futures.ProcessPoolExecutor(
+                        max_workers=numWorkers,
+                        initializer=_initWorker,
+                        initargs=(theme, colorMap)
+                    )
 
-    dctPlotInfo.update(themeArgs)
+                dctErrors = {}
+                dctInfo.update(_runFiles(pool, _renderFile, {
+                    imgPath: (imgPath, style, kwargs)
+                    for imgPath in lstRender
+                }, dctErrors))
 
-    fig = plt.gcf()
-    fig.patch.set_alpha(0)
-    a = fig.gca()
-    a.set_frame_on(False)
-    a.set_xticks([])
-    a.set_yticks([])
-    plt.axis('off')
+                for imgPath in lstRender:
+                    if imgPath in dctErrors:
+                        print('Could not axify ' + imgPath + ': ' +
+                              str(dctErrors[imgPath]))
+                    else:
+                        print('Axified ' + imgPath)
 
-    try:
-        fig.savefig(
-            imgPath + '.png',
-            transparent=True,
-            bbox_inches='tight',
-            pad_inches=0
-        )
-    except IOError:
-        print("Could not write to image file " + imgPath + '.png')
-    else:
-        # call the composition function
-        _compose(theme, dctPlotInfo)
+            # the images stay the same, so only the TeX files are written
+            if rewriteTeX:
+                for imgPath, dctPlotInfo in dctInfo.items():
+                    if imgPath not in lstRender and dctPlotInfo is not None:
+                        _compose(theme, dctPlotInfo)
+                        print('Rewrote ' + imgPath + '.tex')
 
+            time.sleep(interval)
 
-def generateHeader(
-    path
-):
-    """Generate TeX-File to be used as include for the axify dependencies
+            now = time.monotonic()
+            for path in lstWatched:
+                pathTime = mtime(path)
+                if pathTime != dctSeen[path]:
+                    dctSeen[path] = pathTime
+                    dctPending[path] = now
 
-    Parameters
-    ----------
-    path : string
-        path to save the file to
+            lstReady = [
+                path for path, changed in dctPending.items()
+                if now - changed >= debounce
+            ]
+            for path in lstReady:
+                del dctPending[path]
 
-    Examples
-    --------
-    >>> import axify as ax
-    >>> ax.generateHeader('axify')
+            lstRender = [
+                imgPath for imgPath in lstPaths
+                if imgPath + '.npy' in lstReady and
+                dctSeen[imgPath + '.npy'] is not None
+            ]
+            rewriteTeX = False
 
-    This generates a file ``axify.tex`` containing the necessary
-    package includes for TeX.
-    """
+            if colorfy is not None and colorfy + '.json' in lstReady:
+                try:
+                    colorMap = ColorMap(colorMap.name, colorfy=colorfy)
+                except Exception as e:
+                    print('Could not reload colormap: ' + str(e))
+                else:
+                    lstRender = list(lstPaths)
+                    pool = _shutdown(pool)
 
-    depString = r"""% axify dependencies
-\usepackage{pgfplots}
-\pgfplotsset{compat=1.15}
-\usepgfplotslibrary{colormaps}
-    """
+            if theme.path in lstReady:
+                try:
+                    theme.reload()
+                    theme.check(_themeKeys(style, kwargs))
+                except Exception as e:
+                    print('Could not reload theme: ' + str(e))
+                else:
+                    rewriteTeX = True
+                    pool = _shutdown(pool)
+
+                    # stacks write their TeX files while rendering
+                    if style == 'stack':
+                        lstRender = list(lstPaths)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        _shutdown(pool)
 
-    try:
-        # open the file
-        f = open(path + '.tex', 'w')
-    except IOError:
-        print("Could not write to TeX header to %s" % path)
-    else:
-        # write the tikz-snippet
-        f.write(depString)
+
+def _shutdown(pool):
+    if pool is not None:
+        pool.shutdown()
+
+    return None
 
 
 if __name__ == "__main__":
 
-    plotFunctions = {
-        'heatmap': toHeatmap,
-        'scatter': toScatter
-    }
+    import argparse
 
     # define and parse arguments
     parser = argparse.ArgumentParser(
@@ -456,7 +4538,7 @@ if __name__ == "__main__":
         '-s',
         action='store',
         help='Plotting style to use. Currently supported ones: \n' +
-        'heatmap, scatter',
+        'heatmap, scatter, stack, density, lines, complex',
         type=str,
         default='heatmap'
     )
@@ -496,13 +4578,175 @@ if __name__ == "__main__":
     parser.add_argument(
         '-d',
         action='store',
-        help='Path to write a dependency TeX header to',
+        help='Path to write a dependency TeX header to, which also ' +
+        'defines the colormap',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--shared-colormap',
+        action='store_true',
+        help='Refer to the colormap by name instead of defining it in ' +
+        'every TeX file, which needs the header written via -d'
+    )
+
+    parser.add_argument(
+        '-b',
+        action='store',
+        help='Upper bound of the working memory for rendering in MiB',
+        default=_MEM_BUDGET // 2**20,
+        type=int
+    )
+
+    parser.add_argument(
+        '-j',
+        action='store',
+        help='Number of files to render in parallel processes',
+        default=1,
+        type=int
+    )
+
+    parser.add_argument(
+        '-z',
+        action='store',
+        help='Range of the data values, either as two comma separated ' +
+        'values or as a percentile range like p1-p99',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--shared',
+        action='store_true',
+        help='Use one color scale for all files'
+    )
+
+    parser.add_argument(
+        '--watch',
+        action='store_true',
+        help='Keep axifying the files whenever they, the theme or the ' +
+        'colorfy workspace change'
+    )
+
+    parser.add_argument(
+        '--cache',
+        action='store',
+        help='Directory of a render cache to skip unchanged plots',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--cache-size',
+        action='store',
+        help='Maximum size of the render cache in MiB',
+        default=1024,
+        type=int
+    )
+
+    parser.add_argument(
+        '--tiles',
+        action='store',
+        help='Split heatmaps and density plots into tiles, given as the ' +
+        'number of tiles along x and y like 4x2',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--aggregate',
+        action='store',
+        help='What density plots show per pixel: the count of the points ' +
+        'or the sum, mean or max of their values',
+        choices=['count', 'sum', 'mean', 'max'],
+        default='count',
+        type=str
+    )
+
+    parser.add_argument(
+        '--grid',
+        action='store',
+        help='Number of pixels along x and y of density and line plots, ' +
+        'like 1024x768',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--db',
+        action='store_true',
+        help='Show the magnitude of complex plots in decibel'
+    )
+
+    parser.add_argument(
+        '--format',
+        action='store',
+        help='File format of the images, pdf lets pdflatex embed them ' +
+        'without decoding them again',
+        choices=sorted(_imageWriters),
+        default='png',
+        type=str
+    )
+
+    parser.add_argument(
+        '--png-mode',
+        action='store',
+        help='How heatmaps, density and stack plots are stored: rgb for ' +
+        'colors, palette for 8 bit palette images or gray16 for 16 bit ' +
+        'grayscale',
+        choices=['rgb', 'palette', 'gray16'],
+        default='rgb',
+        type=str
+    )
+
+    parser.add_argument(
+        '--compression',
+        action='store',
+        help='Either fast or small, to compress the images quickly or ' +
+        'as small as possible',
+        choices=sorted(_COMPRESSION),
+        default='fast',
+        type=str
+    )
+
+    parser.add_argument(
+        '--level',
+        action='store',
+        help='zlib level from 1 to 9 overriding the one of --compression',
+        default=None,
+        type=int
+    )
+
+    parser.add_argument(
+        '--threads',
+        action='store',
+        help='Number of threads used per file, e.g. for compression',
+        default=1,
+        type=int
+    )
+
+    parser.add_argument(
+        '--profile',
+        action='store',
+        help='Path to write the time spent in every stage of rendering ' +
+        'to, as CSV if it ends with .csv and as JSON otherwise',
         default='',
         type=str
     )
 
     args = parser.parse_args()
 
+    # options that only some plotting styles understand
+    if args.tiles != "" and args.s not in ['heatmap', 'density']:
+        parser.error('--tiles is only supported by heatmap and density plots')
+    if args.png_mode != 'rgb' and args.s not in [
+        'heatmap', 'density', 'stack'
+    ]:
+        parser.error(
+            '--png-mode is only supported by heatmap, density and stack plots'
+        )
+
     # paths to the numpy files
     lstPaths = args.p
 
@@ -510,11 +4754,18 @@ if __name__ == "__main__":
     colorMapName = args.m
 
     # desired theme-skeleton file
-    theme = Theme(args.t + '.tex')
+    try:
+        theme = Theme(args.t + '.tex')
+    except FileNotFoundError:
+        print('Could not find theme file ' + args.t + '.tex')
+        raise SystemExit(1)
+    except ValueError as e:
+        print(str(e))
+        raise SystemExit(1)
 
     # check if the functionality is implemented
     try:
-        function = plotFunctions[args.s]
+        plotFunctions[args.s]
     except KeyError:
         print('Requested ' + args.s + ' functionality not implemented.')
         raise(NotImplementedError)
@@ -534,23 +4785,102 @@ if __name__ == "__main__":
                     '.json'
                 )
 
-        # write a possibly requested header
+        # write a possibly requested header, which then also defines the
+        # colormap for all plots
         depFile = args.d
         if depFile != "":
-            generateHeader(args.d)
+            try:
+                generateHeader(args.d, [colorMap])
+            except OSError as e:
+                print('Could not write the TeX header to %s: %s' % (
+                    args.d, e
+                ))
+                raise SystemExit(1)
+
+        # set up a possibly requested render cache
+        if args.cache != "":
+            cache = RenderCache(args.cache, maxSize=args.cache_size * 2**20)
+        else:
+            cache = None
+
+        # a range of data values is either given explicitly or as
+        # percentiles
+        if args.z == "":
+            zLim = []
+        elif args.z.startswith('p'):
+            zLim = args.z
+        else:
+            zLim = [float(z) for z in args.z.split(',')]
+
+        # options of single plotting styles, e.g. tiles of heatmaps
+        dctStyleArgs = {}
+        if args.tiles != "":
+            dctStyleArgs['tiles'] = [int(n) for n in args.tiles.split('x')]
+        if args.png_mode != 'rgb':
+            dctStyleArgs['pngMode'] = args.png_mode
+        if args.s == 'density':
+            dctStyleArgs['aggregate'] = args.aggregate
+        if args.s == 'complex':
+            dctStyleArgs['dB'] = args.db
+        if args.s in ['density', 'lines'] and args.grid != "":
+            dctStyleArgs['imgSize'] = [int(n) for n in args.grid.split('x')]
+
+        # keep axifying the files as they change until interrupted
+        if args.watch:
+            watch(
+                lstPaths,
+                args.s,
+                theme,
+                colorMap,
+                colorfy=colorfyWS if colorfyWS != "" else None,
+                numWorkers=args.j,
+                memBudget=args.b * 2**20,
+                cache=cache,
+                zLim=zLim,
+                sharedColorMap=args.shared_colormap,
+                compression=args.compression,
+                compressionLevel=args.level,
+                imgFormat=args.format,
+                numThreads=args.threads,
+                **dctStyleArgs
+            )
+            raise SystemExit(0)
+
+        # record where the time goes, if requested
+        if args.profile != "":
+            profile = Profile()
+        else:
+            profile = contextlib.nullcontext()
+
+        # go through all images, memory mapping the arrays such that they
+        # are only read in bands while rendering
+        with profile:
+            dctErrors = renderBatch(
+                lstPaths,
+                args.s,
+                theme,
+                colorMap,
+                numWorkers=args.j,
+                sharedScale=args.shared,
+                memBudget=args.b * 2**20,
+                cache=cache,
+                zLim=zLim,
+                sharedColorMap=args.shared_colormap,
+                compression=args.compression,
+                compressionLevel=args.level,
+                imgFormat=args.format,
+                numThreads=args.threads,
+                **dctStyleArgs
+            )
+
+        if args.profile != "":
+            profile.save(args.profile)
+            print(profile.summary())
 
-        # go through all images
         for imgPath in lstPaths:
-            try:
-                open(imgPath + '.npy')
-                # load the numpy array and call the entry point
-                # function for it
-            except (FileNotFoundError):
-                print('File ' + imgPath + '.npy not found.')
-            else:
-                function(
-                    np.load(imgPath + '.npy'),
-                    imgPath,
-                    theme,
-                    colorMap=colorMap,
-                )
+            if imgPath in dctErrors:
+                print('Could not axify ' + imgPath + ': ' +
+                      str(dctErrors[imgPath]))
+
+        if dctErrors:
+            raise SystemExit(1)
@@ -0,0 +1,488 @@
+#!/usr/bin/env python3
+
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+
+r"""
+Benchmarks of axify
+
+Every benchmark case runs in a fresh python process, such that its peak
+memory usage can be measured in isolation. For every case the wall time,
+the peak resident memory and the size of the written files are recorded
+and stored as JSON, which can be compared against an earlier run:
+
+    python benchmarks/bench.py --quick -o before.json
+    python benchmarks/bench.py --quick -o after.json --compare before.json
+
+The comparison reports every case, which became slower or needed more
+memory than allowed by --threshold, and exits with status 1 if there is
+any. No network access or packages beyond the ones axify needs are
+required.
+"""
+
+
+import argparse
+import datetime
+import json
+import os
+import platform
+import re
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+
+repoPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repoPath)
+
+# data sizes of the individual benchmarks, the quick variants are meant to
+# finish within a few minutes
+heatmapSizes = [512, 1024, 2048, 4096, 8192, 16384]
+heatmapTypes = ['float32', 'float64', 'int32']
+scatterSizes = [10**3, 10**4, 10**5, 10**6, 10**7]
+colorMapNames = ['jet', 'viridis', 'hot']
+cliSizes = [1024, 4096]
+
+# numbers of matplotlib scatter plots rendered concurrently, whose peak
+# memory should not grow with the number of plots
+concurrentCounts = [10, 100]
+
+quickHeatmapSizes = [512, 1024, 2048]
+quickScatterSizes = [10**3, 10**5, 10**6]
+quickCliSizes = [1024]
+
+def listCases(quick):
+    r"""
+    Names of all benchmark cases, each being a colon separated list of
+    the benchmark and its parameters.
+    """
+    lstCases = ['import']
+    for size in quickHeatmapSizes if quick else heatmapSizes:
+        for dtype in heatmapTypes:
+            lstCases.append('heatmap:%d:%s' % (size, dtype))
+        lstCases.append('complex:%d' % size)
+
+    for num in quickScatterSizes if quick else scatterSizes:
+        lstCases.append('scatter:%d' % num)
+        lstCases.append('density:%d' % num)
+        lstCases.append('lines:%d' % (100 * num))
+
+    for count in concurrentCounts:
+        lstCases.append('concurrent:%d' % count)
+
+    for name in colorMapNames:
+        lstCases.append('colormap:%s' % name)
+        lstCases.append('topgf:%s' % name)
+
+    for size in quickCliSizes if quick else cliSizes:
+        lstCases.append('cli:%d' % size)
+
+    return lstCases
+
+
+def _heatmapData(size, dtype):
+    import numpy as np
+
+    # a smooth pattern with some noise compresses like measured data
+    rng = np.random.default_rng(0)
+    x = np.linspace(-8, 8, size)
+    arrData = np.sin(x[:, None] * x[None, :])
+    arrData += 0.05 * rng.standard_normal((size, size))
+    if dtype.startswith('int'):
+        arrData *= 1000
+
+    return arrData.astype(dtype)
+
+
+def _scatterData(num):
+    import numpy as np
+
+    rng = np.random.default_rng(0)
+    arrData = np.empty((num, 3))
+    arrData[:, :2] = rng.standard_normal((num, 2))
+    arrData[:, 2] = np.hypot(arrData[:, 0], arrData[:, 1])
+
+    return arrData
+
+
+def inputData(case):
+    r"""
+    The array a benchmark case renders, or None if it needs no input. It is
+    generated by a process of its own and memory mapped by the process
+    running the case, such that generating it does not count towards the
+    memory of the case. The harness itself never holds the data, since on
+    linux a process starts out with the peak memory of its parent.
+    """
+    import numpy as np
+
+    lstArgs = case.split(':')
+    kind = lstArgs[0]
+
+    if kind == 'heatmap':
+        return _heatmapData(int(lstArgs[1]), lstArgs[2])
+
+    if kind == 'complex':
+        # a complex field whose phase winds around its zeros
+        size = int(lstArgs[1])
+        x = np.linspace(-2, 2, size)
+        arrData = (x[None, :] + 1j * x[:, None])**3 - 1
+        arrData += 0.05 * _heatmapData(size, 'float64')
+        return arrData
+
+    if kind in ['scatter', 'density']:
+        return _scatterData(int(lstArgs[1]))
+
+    if kind == 'lines':
+        # a random walk in single precision, as recorded by digitizers
+        rng = np.random.default_rng(0)
+        return np.cumsum(
+            rng.standard_normal(int(lstArgs[1]), dtype=np.float32)
+        )
+
+    if kind == 'cli':
+        return _heatmapData(int(lstArgs[1]), 'float64')
+
+    return None
+
+
+def _outputSize(path):
+    return sum(
+        os.path.getsize(os.path.join(path, name))
+        for name in os.listdir(path)
+        if not name.endswith('.npy')
+    )
+
+
+def runCase(case, tmpPath):
+    r"""
+    Run a single benchmark case in this process and return its results.
+    The input of the case is memory mapped from bench.npy in tmpPath, so
+    neither time nor memory of generating it are measured.
+    """
+    lstArgs = case.split(':')
+    kind = lstArgs[0]
+
+    # the import happens once per process, so it is timed on its own
+    timeStart = time.perf_counter()
+    import axify as ax
+    importTime = time.perf_counter() - timeStart
+
+    theme = ax.Theme(os.path.join(repoPath, 'demo', 'simple.tex'))
+    imgPath = os.path.join(tmpPath, 'bench')
+    numRepeat = 1
+
+    if os.path.isfile(imgPath + '.npy'):
+        import numpy as np
+        arrData = np.load(imgPath + '.npy', mmap_mode='r')
+
+    if kind == 'import':
+        def function():
+            pass
+
+    elif kind == 'heatmap':
+        colorMap = ax.ColorMap('jet')
+
+        def function():
+            ax.toHeatmap(arrData, imgPath, theme, colorMap)
+
+    elif kind == 'complex':
+        colorMap = ax.ColorMap('hsv')
+
+        def function():
+            ax.toComplexHeatmap(arrData, imgPath, theme, colorMap, dB=True)
+
+    elif kind == 'scatter':
+        colorMap = ax.ColorMap('jet')
+
+        def function():
+            ax.toScatter(arrData, imgPath, theme, colorMap)
+
+    elif kind == 'density':
+        colorMap = ax.ColorMap('jet')
+
+        def function():
+            ax.toDensity(arrData, imgPath, theme, colorMap)
+
+    elif kind == 'lines':
+        colorMap = ax.ColorMap('jet')
+
+        def function():
+            ax.toLines(arrData, imgPath, theme, colorMap)
+
+    elif kind == 'concurrent':
+        import concurrent.futures
+
+        arrData = _scatterData(1000)
+        colorMap = ax.ColorMap('jet')
+
+        def render(ii):
+            ax.toScatter(
+                arrData, '%s-%d' % (imgPath, ii), theme, colorMap,
+                renderer='matplotlib'
+            )
+
+        def function():
+            with concurrent.futures.ThreadPoolExecutor(4) as pool:
+                list(pool.map(render, range(int(lstArgs[1]))))
+
+    elif kind == 'colormap':
+        numRepeat = 100
+
+        def function():
+            # measure the actual construction, not the process wide cache
+            ax.axify._colorMapCache.clear()
+            ax.ColorMap(lstArgs[1])
+
+    elif kind == 'topgf':
+        colorMap = ax.ColorMap(lstArgs[1])
+        numRepeat = 100
+
+        def function():
+            colorMap._cache.pop(('pgf', 0.5 / 255), None)
+            colorMap.toPGF()
+
+    elif kind == 'cli':
+        themePath = os.path.join(repoPath, 'demo', 'simple')
+
+        def function():
+            subprocess.check_call([
+                sys.executable,
+                os.path.join(repoPath, 'axify', 'axify.py'),
+                '-p', imgPath,
+                '-t', themePath
+            ])
+
+    else:
+        raise ValueError('Unknown benchmark ' + case)
+
+    timeStart = time.perf_counter()
+    for ii in range(numRepeat):
+        function()
+    wallTime = (time.perf_counter() - timeStart) / numRepeat
+    if kind == 'import':
+        wallTime = importTime
+
+    # peak memory is reported in KiB on linux, but in bytes on macOS
+    peakRSS = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    if kind == 'cli':
+        peakRSS = max(
+            peakRSS,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+        )
+    if sys.platform != 'darwin':
+        peakRSS *= 1024
+
+    return {
+        'case': case,
+        'wallTime': wallTime,
+        'peakRSS': peakRSS,
+        'outputSize': _outputSize(tmpPath),
+    }
+
+
+def _spawnCase(case):
+    with tempfile.TemporaryDirectory(prefix='axify-bench-') as tmpPath:
+        subprocess.check_call([
+            sys.executable, os.path.abspath(__file__), '--prepare', case,
+            '--tmp', tmpPath
+        ])
+
+        proc = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), '--run', case,
+             '--tmp', tmpPath],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            universal_newlines=True
+        )
+
+    if proc.returncode != 0:
+        # the last line of a traceback names the exception, but a process
+        # that was killed may not have written anything
+        lstLines = proc.stderr.strip().splitlines()
+        if lstLines:
+            error = lstLines[-1]
+        else:
+            error = 'exited with status %d' % proc.returncode
+        return {'case': case, 'error': error}
+
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def _environment():
+    def version(name):
+        try:
+            return __import__(name).__version__
+        except ImportError:
+            return None
+
+    try:
+        commit = subprocess.check_output(
+            ['git', 'rev-parse', 'HEAD'],
+            cwd=repoPath,
+            stderr=subprocess.DEVNULL,
+            universal_newlines=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'date': datetime.datetime.now().isoformat(),
+        'commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'numpy': version('numpy'),
+        'matplotlib': version('matplotlib'),
+    }
+
+
+def compare(dctResults, dctBaseline, threshold):
+    r"""
+    Return the descriptions of all cases, which got worse than the baseline
+    by more than the factor threshold in time or memory.
+    """
+    dctOld = {res['case']: res for res in dctBaseline['results']}
+    lstWorse = []
+    for res in dctResults['results']:
+        old = dctOld.get(res['case'])
+        if old is None or 'error' in old or 'error' in res:
+            continue
+
+        for key in ['wallTime', 'peakRSS']:
+            if res[key] > threshold * old[key]:
+                lstWorse.append('%s: %s %.3g -> %.3g (x%.2f)' % (
+                    res['case'], key, old[key], res[key],
+                    res[key] / old[key]
+                ))
+
+    return lstWorse
+
+
+if __name__ == "__main__":
+
+    parser = argparse.ArgumentParser(
+        description='Benchmark axify and store the results as JSON.'
+    )
+
+    parser.add_argument(
+        '-o',
+        action='store',
+        help='Path of the JSON file to store the results in',
+        default='bench.json',
+        type=str
+    )
+
+    parser.add_argument(
+        '-k',
+        action='store',
+        help='Only run the cases matching this regular expression',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--quick',
+        action='store_true',
+        help='Only run the smaller data sizes'
+    )
+
+    parser.add_argument(
+        '--compare',
+        action='store',
+        help='JSON file of an earlier run to compare against',
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--threshold',
+        action='store',
+        help='Factor by which a case may get worse in the comparison',
+        default=1.25,
+        type=float
+    )
+
+    parser.add_argument(
+        '--run',
+        action='store',
+        help=argparse.SUPPRESS,
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--prepare',
+        action='store',
+        help=argparse.SUPPRESS,
+        default='',
+        type=str
+    )
+
+    parser.add_argument(
+        '--tmp',
+        action='store',
+        help=argparse.SUPPRESS,
+        default='',
+        type=str
+    )
+
+    args = parser.parse_args()
+
+    # we are the child process generating the input of a single case
+    if args.prepare != '':
+        arrData = inputData(args.prepare)
+        if arrData is not None:
+            import numpy as np
+            np.save(os.path.join(args.tmp, 'bench.npy'), arrData)
+        raise SystemExit(0)
+
+    # we are the child process running a single case
+    if args.run != '':
+        print(json.dumps(runCase(args.run, args.tmp)))
+        raise SystemExit(0)
+
+    lstCases = [
+        case for case in listCases(args.quick)
+        if re.search(args.k, case)
+    ]
+
+    dctResults = {'environment': _environment(), 'results': []}
+    for case in lstCases:
+        res = _spawnCase(case)
+        dctResults['results'].append(res)
+
+        if 'error' in res:
+            print('%-24s failed: %s' % (case, res['error']))
+        else:
+            print('%-24s %10.3g s %10.1f MiB %10.1f KiB' % (
+                case, res['wallTime'], res['peakRSS'] / 2**20,
+                res['outputSize'] / 2**10
+            ))
+
+    with open(args.o, 'w') as f:
+        json.dump(dctResults, f, indent=1)
+
+    if args.compare != '':
+        with open(args.compare) as f:
+            lstWorse = compare(dctResults, json.load(f), args.threshold)
+
+        for line in lstWorse:
+            print('Regression ' + line)
+
+        if lstWorse:
+            raise SystemExit(1)
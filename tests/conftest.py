@@ -0,0 +1,44 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import sys
+
+import numpy as np
+import pytest
+
+
+repoPath = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, repoPath)
+
+import axify as ax  # noqa: E402
+
+
+@pytest.fixture
+def theme():
+    return ax.Theme(os.path.join(repoPath, 'demo', 'simple.tex'))
+
+
+def scatterData(num):
+    r"""
+    Points scattered normally around the origin with their distance to it
+    as value.
+    """
+    rng = np.random.default_rng(0)
+    arrData = np.empty((num, 3))
+    arrData[:, :2] = rng.standard_normal((num, 2))
+    arrData[:, 2] = np.hypot(arrData[:, 0], arrData[:, 1])
+
+    return arrData
@@ -0,0 +1,84 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import json
+import os
+
+import numpy as np
+
+import axify as ax
+
+
+def test_cacheManifestShared(tmp_path, theme):
+    # several processes store into one cache, whose manifest must still
+    # list every image
+    rng = np.random.default_rng(0)
+    lstPaths = []
+    for ii in range(8):
+        lstPaths.append(str(tmp_path / ('cache-%d' % ii)))
+        np.save(lstPaths[-1] + '.npy', rng.standard_normal((64, 64)))
+
+    cachePath = tmp_path / 'cache'
+    dctErrors = ax.renderBatch(
+        lstPaths, 'heatmap', theme, ax.ColorMap('jet'),
+        numWorkers=4, cache=ax.RenderCache(str(cachePath))
+    )
+    assert not dctErrors
+
+    with open(cachePath / 'manifest.json') as f:
+        numEntries = len(json.load(f))
+
+    numBlobs = sum(
+        len(os.listdir(path)) for path in cachePath.iterdir()
+        if path.is_dir()
+    )
+    assert numEntries == numBlobs == len(lstPaths)
+
+
+def test_cacheStackThreads(tmp_path, theme):
+    # threads rendering the frames of a stack store into one cache, whose
+    # manifest must still list every frame
+    arrStack = np.random.default_rng(0).standard_normal((16, 32, 32))
+    cachePath = tmp_path / 'cache'
+    ax.toHeatmapStack(
+        arrStack, str(tmp_path / 'stack'), theme, ax.ColorMap('jet'),
+        numThreads=4, cache=ax.RenderCache(str(cachePath))
+    )
+
+    with open(cachePath / 'manifest.json') as f:
+        assert len(json.load(f)) == arrStack.shape[0]
+
+
+def test_sharedScaleRejects(tmp_path, theme):
+    # files the plot rejects are reported and do not stretch the shared
+    # scale of the others
+    lstPaths = [str(tmp_path / name) for name in ['a', 'b', 'line', 'cplx']]
+    np.save(lstPaths[0] + '.npy', np.zeros((8, 8)))
+    np.save(lstPaths[1] + '.npy', np.ones((8, 8)))
+    np.save(lstPaths[2] + '.npy', np.full(8, 100.0))
+    np.save(lstPaths[3] + '.npy', np.full((8, 8), -100 + 0j))
+
+    dctErrors = ax.renderBatch(
+        lstPaths, 'heatmap', theme, ax.ColorMap('jet'),
+        numWorkers=1, sharedScale=True
+    )
+    assert sorted(dctErrors) == sorted(lstPaths[2:])
+    assert all(isinstance(e, ValueError) for e in dctErrors.values())
+
+    for imgPath in lstPaths[:2]:
+        with open(imgPath + '.tex') as f:
+            texString = f.read()
+        assert 'point meta min = 0.000000' in texString
+        assert 'point meta max = 1.000000' in texString
@@ -0,0 +1,67 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from conftest import repoPath, scatterData
+
+
+def runCLI(*args):
+    return subprocess.run(
+        [sys.executable, os.path.join(repoPath, 'axify', 'axify.py')] +
+        list(args),
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        universal_newlines=True
+    )
+
+
+@pytest.mark.parametrize('style, status', [
+    ('heatmap', 0), ('density', 0), ('scatter', 2), ('lines', 2)
+])
+def test_pngModeStyles(tmp_path, style, status):
+    # styles without pngMode are rejected with a usage error instead of
+    # failing per file
+    imgPath = str(tmp_path / 'cli')
+    np.save(imgPath + '.npy', scatterData(64))
+
+    proc = runCLI(
+        '-p', imgPath, '-t', os.path.join(repoPath, 'demo', 'simple'),
+        '-s', style, '--png-mode', 'palette'
+    )
+    assert proc.returncode == status, proc.stdout + proc.stderr
+
+
+@pytest.mark.parametrize('lstArgs, shared', [
+    ([], False), (['--shared-colormap'], True)
+])
+def test_sharedColorMap(tmp_path, lstArgs, shared):
+    # writing a header alone keeps the colormap defined in every figure
+    imgPath = str(tmp_path / 'cli')
+    np.save(imgPath + '.npy', np.eye(8))
+
+    proc = runCLI(
+        '-p', imgPath, '-t', os.path.join(repoPath, 'demo', 'simple'),
+        '-d', str(tmp_path / 'axify'), *lstArgs
+    )
+    assert proc.returncode == 0, proc.stdout + proc.stderr
+
+    with open(imgPath + '.tex') as f:
+        assert ('colormap name=' in f.read()) == shared
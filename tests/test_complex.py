@@ -0,0 +1,29 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+import axify as ax
+
+
+@pytest.mark.parametrize('value', [0, np.nan])
+def test_dBWithoutMagnitude(tmp_path, theme, value):
+    # magnitudes that are all zero or NaN still get a finite range
+    dctInfo = ax.toComplexHeatmap(
+        np.full((16, 16), value, dtype=np.complex64),
+        str(tmp_path / 'complex'), theme, ax.ColorMap('hsv'), dB=True
+    )
+    assert np.isfinite([dctInfo['dataMin'], dctInfo['dataMax']]).all()
@@ -0,0 +1,76 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+import axify as ax
+
+
+@pytest.mark.parametrize('function', [ax.toHeatmap, ax.toComplexHeatmap])
+def test_cacheStats(tmp_path, theme, function):
+    # the same data with different precomputed statistics must not be
+    # taken from the cache of the first rendering
+    arrData = np.random.default_rng(0).standard_normal((64, 64))
+    cache = ax.RenderCache(str(tmp_path / 'cache'))
+
+    lstLimits = [
+        function(
+            arrData, str(tmp_path / 'stats'), theme, ax.ColorMap('jet'),
+            zLim='p1-p99', stats=ax.computeStats(scale * arrData),
+            cache=cache
+        )['dataMin']
+        for scale in [1, 10]
+    ]
+    assert lstLimits[1] == pytest.approx(10 * lstLimits[0], rel=1e-2)
+
+
+def test_poolingShortWide(tmp_path, theme):
+    # a short, but very wide array keeps a row of pixels
+    arrData = np.random.default_rng(0).standard_normal((10, 20000))
+    dctInfo = ax.toHeatmap(
+        arrData, str(tmp_path / 'pooling'), theme, ax.ColorMap('jet'),
+        imgWidth=8
+    )
+    assert (dctInfo['yMin'], dctInfo['yMax']) == (0, 10)
+
+
+@pytest.mark.parametrize('compression', ['fast', 'small'])
+def test_memBudget(tmp_path, theme, compression):
+    # the memory allocated while rendering a memory mapped heatmap stays
+    # within memBudget
+    size = 2048
+    memBudget = 16 * 2**20
+    arrData = np.lib.format.open_memmap(
+        str(tmp_path / 'memory.npy'), 'w+', np.float64, (size, size)
+    )
+    x = np.linspace(-8, 8, size)
+    for ii in range(0, size, 64):
+        arrData[ii:ii + 64] = np.sin(x[ii:ii + 64, None] * x[None, :])
+
+    colorMap = ax.ColorMap('jet')
+    tracemalloc.start()
+    try:
+        ax.toHeatmap(
+            arrData, str(tmp_path / 'memory'), theme, colorMap,
+            memBudget=memBudget, compression=compression
+        )
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert peak <= memBudget
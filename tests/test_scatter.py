@@ -0,0 +1,81 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import gc
+import threading
+import weakref
+
+import pytest
+from matplotlib.figure import Figure
+
+import axify as ax
+from conftest import scatterData
+
+
+def numFigures():
+    return sum(isinstance(obj, Figure) for obj in gc.get_objects())
+
+
+def test_matplotlibFigureReused(tmp_path, theme):
+    # without the garbage collector no figures pile up, since every thread
+    # draws all of its plots on one figure
+    colorMap = ax.ColorMap('jet')
+    ax.toScatter(
+        scatterData(100), str(tmp_path / 'scatter'), theme, colorMap,
+        renderer='matplotlib'
+    )
+
+    gc.collect()
+    gc.disable()
+    try:
+        numBefore = numFigures()
+        for ii in range(10):
+            ax.toScatter(
+                scatterData(100), str(tmp_path / ('scatter-%d' % ii)),
+                theme, colorMap, renderer='matplotlib'
+            )
+        numAfter = numFigures()
+    finally:
+        gc.enable()
+
+    assert numAfter == numBefore
+
+
+def test_matplotlibFigureFreed(tmp_path, theme):
+    # the figure of a thread goes away with the thread
+    lstRefs = []
+
+    def render():
+        ax.toScatter(
+            scatterData(100), str(tmp_path / 'scatter'), theme,
+            ax.ColorMap('jet'), renderer='matplotlib'
+        )
+        lstRefs.append(weakref.ref(ax.axify._matplotlibFigures.figure))
+
+    thread = threading.Thread(target=render)
+    thread.start()
+    thread.join()
+
+    gc.collect()
+    assert lstRefs[0]() is None
+
+
+@pytest.mark.parametrize('renderer', ['Raster', 'agg'])
+def test_unknownRenderer(tmp_path, theme, renderer):
+    with pytest.raises(ValueError, match='Unknown renderer'):
+        ax.toScatter(
+            scatterData(16), str(tmp_path / 'scatter'), theme,
+            ax.ColorMap('jet'), renderer=renderer
+        )
@@ -0,0 +1,46 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as np
+import pytest
+
+import axify as ax
+
+
+def test_limitsPercentiles():
+    stats = ax.computeStats(np.arange(1001, dtype=np.float64))
+    assert stats.limits('p10-p90') == pytest.approx([100, 900], rel=1e-3)
+    assert stats.limits('p0-p100') == pytest.approx([0, 1000], abs=1e-6)
+
+
+@pytest.mark.parametrize('zLim', ['p99-p1', 'p1-p101', 'p1.2.3-p99', 'q1'])
+def test_limitsInvalid(zLim):
+    stats = ax.computeStats(np.arange(100, dtype=np.float64))
+    with pytest.raises(ValueError):
+        stats.limits(zLim)
+
+
+@pytest.mark.parametrize('zLim', [[], 'p1-p99'])
+def test_limitsAllNaN(zLim):
+    stats = ax.computeStats(np.full((4, 4), np.nan))
+    assert stats.limits(zLim) == [0, 1]
+
+
+def test_heatmapAllNaN(tmp_path, theme):
+    dctInfo = ax.toHeatmap(
+        np.full((4, 4), np.nan), str(tmp_path / 'nan'), theme,
+        ax.ColorMap('jet')
+    )
+    assert (dctInfo['dataMin'], dctInfo['dataMax']) == (0, 1)
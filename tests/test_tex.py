@@ -0,0 +1,32 @@
+# This file is part of axify.
+
+# axify is free software: you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation, either version 3 of the License, or
+# (at your option) any later version.
+
+# axify is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+
+# You should have received a copy of the GNU General Public License
+# along with axify.  If not, see <http://www.gnu.org/licenses/>.
+
+import pytest
+
+import axify as ax
+
+
+def test_generateHeader(tmp_path):
+    ax.generateHeader(str(tmp_path / 'axify'), [ax.ColorMap('hot')])
+
+    with open(tmp_path / 'axify.tex') as f:
+        texString = f.read()
+    assert '\\usepackage{pgfplots}' in texString
+    assert 'colormap={hot}' in texString
+
+
+def test_generateHeaderUnwritable(tmp_path):
+    with pytest.raises(OSError):
+        ax.generateHeader(str(tmp_path / 'missing' / 'axify'))